@@ -1,8 +1,9 @@
-import asyncio
 import traceback
 from logger import logger
+from event_loop import run_coroutine
+from metrics import PROMETHEUS_CONTENT_TYPE, render_metrics
 from tests.mock_data import TEST_SCENARIOS
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from resources.agents.coordinator_agent import CoordinatorAgent
 from resources.utils.json_validator import clean_json_request
 
@@ -27,7 +28,7 @@ def receive():
         clean_json = clean_json_request(data)
 
         # agentic system calls
-        result = asyncio.run(coordinator.schedule_meeting(clean_json))
+        result = run_coroutine(coordinator.schedule_meeting(clean_json))
 
         success = result.get('EventStart') is not None and 'error' not in result
         logger.info(f"Processing complete-Success: {success}")
@@ -61,7 +62,7 @@ def demo_scenario(scenario_name):
         print(f"\nRunning Demo Scenario: {scenario_name}")
         print(f"Scenario description: {scenario_data.get('EmailContent', '')}")
 
-        result = asyncio.run(coordinator.schedule_meeting(scenario_data))
+        result = run_coroutine(coordinator.schedule_meeting(scenario_data))
 
         return jsonify({
             "scenario": scenario_name,
@@ -78,5 +79,11 @@ def demo_scenario(scenario_name):
             "error": str(e)
         }), 500
 
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Stage latency histograms and LLM usage in Prometheus text format"""
+    return Response(render_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,212 @@
+import json
+import time
+import traceback
+from config import AGENT_CONFIG
+from coordinator_agent import CoordinatorAgent
+from json_validator import sanitize_json_request
+from metrics import PROMETHEUS_CONTENT_TYPE, render_metrics
+from profiling import PROFILE_HEADER, header_requests_profile
+from tests.mock_data import TEST_SCENARIOS
+
+coordinator = CoordinatorAgent()
+
+
+async def _read_body(receive) -> bytes:
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return body
+
+
+async def _send_json(send, payload, status: int = 200):
+    body = json.dumps(payload, sort_keys=True).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii'))
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _send_text(send, text: str, content_type: str, status: int = 200):
+    body = text.encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', content_type.encode('ascii')),
+            (b'content-length', str(len(body)).encode('ascii'))
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def _header(scope, name: str) -> str:
+    name = name.lower().encode('latin-1')
+    for key, value in scope.get('headers', []):
+        if key.lower() == name:
+            return value.decode('latin-1')
+    return None
+
+
+async def receive_meeting(scope, receive, send):
+    start_time = time.time()
+    data = None
+
+    try:
+        body = await _read_body(receive)
+        data = json.loads(body) if body else None
+    except ValueError:
+        data = None
+
+    if not data:
+        await _send_json(send, {"error": "No JSON data provided"}, 400)
+        return
+    if not isinstance(data, dict):
+        await _send_json(send, {"error": "Expected a JSON object"}, 400)
+        return
+
+    try:
+        request_id = data.get('Request_id', 'unknown')
+        print(f"[{time.time():.3f}] Processing: {request_id}")
+
+        sanitized_data = sanitize_json_request(data)
+
+        profile = header_requests_profile(_header(scope, PROFILE_HEADER))
+        result = await coordinator.schedule_meeting(sanitized_data, profile=profile)
+
+        elapsed = time.time() - start_time
+        success = result.get('EventStart') is not None and 'error' not in result
+
+        if success:
+            print(f"[{time.time():.3f}] Completed in {elapsed:.2f}s")
+            print(f"Success: {result['EventStart']} to {result['EventEnd']}")
+        else:
+            print(f"[{time.time():.3f}] Completed in {elapsed:.2f}s")
+            print(f"Failed: {result.get('error', 'Unknown error')}")
+
+        await _send_json(send, result)
+
+    except Exception as e:
+        elapsed = time.time() - start_time
+        print(f"[{time.time():.3f}] Error after {elapsed:.2f}s: {e}")
+        traceback.print_exc()
+        await _send_json(send, {
+            "error": str(e),
+            "Request_id": data.get('Request_id', 'unknown')
+        }, 500)
+
+
+async def receive_batch(receive, send):
+    start_time = time.time()
+
+    try:
+        body = await _read_body(receive)
+        data = json.loads(body) if body else None
+    except ValueError:
+        data = None
+
+    meeting_requests = data.get('Requests') if isinstance(data, dict) else data
+
+    if (not isinstance(meeting_requests, list) or not meeting_requests
+            or not all(isinstance(meeting_request, dict) for meeting_request in meeting_requests)):
+        await _send_json(send, {"error": "Expected a JSON list of meeting requests"}, 400)
+        return
+    if len(meeting_requests) > AGENT_CONFIG['max_batch_size']:
+        await _send_json(send, {"error": f"Batch larger than {AGENT_CONFIG['max_batch_size']} requests"}, 400)
+        return
+
+    try:
+        print(f"[{time.time():.3f}] Processing batch of {len(meeting_requests)} requests")
+
+        sanitized_requests = [sanitize_json_request(meeting_request) for meeting_request in meeting_requests]
+        results = await coordinator.schedule_batch(sanitized_requests)
+
+        elapsed = time.time() - start_time
+        scheduled = sum(1 for result in results if result.get('EventStart') is not None)
+        print(f"[{time.time():.3f}] Batch completed in {elapsed:.2f}s: {scheduled}/{len(results)} scheduled")
+
+        await _send_json(send, results)
+
+    except Exception as e:
+        elapsed = time.time() - start_time
+        print(f"[{time.time():.3f}] Batch error after {elapsed:.2f}s: {e}")
+        traceback.print_exc()
+        await _send_json(send, {"error": str(e)}, 500)
+
+
+async def demo_scenario(scenario_name: str, send):
+    if scenario_name not in TEST_SCENARIOS:
+        await _send_json(send, {
+            "error": "Scenario not found",
+            "available_scenarios": list(TEST_SCENARIOS.keys())
+        }, 404)
+        return
+
+    try:
+        scenario_data = TEST_SCENARIOS[scenario_name]
+        result = await coordinator.schedule_meeting(scenario_data)
+
+        await _send_json(send, {
+            "scenario": scenario_name,
+            "input": scenario_data,
+            "result": result,
+            "success": result.get('EventStart') is not None and 'error' not in result
+        })
+
+    except Exception as e:
+        print(f"Demo scenario error: {e}")
+        traceback.print_exc()
+        await _send_json(send, {
+            "scenario": scenario_name,
+            "error": str(e)
+        }, 500)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await coordinator.llm.aclose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI entry point: every request is awaited on the server's one event loop."""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+
+    if scope['type'] != 'http':
+        return
+
+    method = scope['method']
+    path = scope['path']
+
+    if path == '/receive' and method == 'POST':
+        await receive_meeting(scope, receive, send)
+    elif path == '/receive/batch' and method == 'POST':
+        await receive_batch(receive, send)
+    elif path.startswith('/demo/') and method == 'GET':
+        await demo_scenario(path[len('/demo/'):], send)
+    elif path == '/metrics' and method == 'GET':
+        await _send_text(send, render_metrics(), PROMETHEUS_CONTENT_TYPE)
+    elif path in ('/receive', '/receive/batch', '/metrics') or path.startswith('/demo/'):
+        await _send_json(send, {"error": "Method not allowed"}, 405)
+    else:
+        await _send_json(send, {"error": "Not found"}, 404)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run("asgi:app", host='0.0.0.0', port=5000)
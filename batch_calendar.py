@@ -0,0 +1,44 @@
+from typing import Dict, List
+from busy_index import BusyIntervalIndex
+
+
+class BatchCalendar:
+    """Calendars of every attendee in a batch, fetched once and shared by its requests.
+
+    Each attendee has one event list and one BusyIntervalIndex over the whole
+    batch window. Participant agents search against these indexes directly, and
+    commit() adds a placed meeting to every attendee, so later requests in the
+    batch see it as busy.
+    """
+
+    def __init__(self, events_by_email: Dict[str, List[Dict]]):
+        self.events = {email: list(events or []) for email, events in events_by_email.items()}
+        self.indexes = {email: BusyIntervalIndex(events) for email, events in self.events.items()}
+        self.committed = 0
+
+    def index_for(self, email: str) -> BusyIntervalIndex:
+        index = self.indexes.get(email)
+        if index is None:
+            self.events[email] = []
+            index = BusyIntervalIndex(self.events[email])
+            self.indexes[email] = index
+        return index
+
+    def commit(self, attendee_emails: List[str], event: Dict):
+        for email in attendee_emails:
+            self.index_for(email).add(dict(event))
+        self.committed += 1
+
+    def commit_response(self, response: Dict):
+        """Add the meeting a scheduling response placed, if any."""
+        if not response.get('EventStart'):
+            return
+
+        attendee_emails = [attendee['email'] for attendee in response.get('Attendees', [])]
+        self.commit(attendee_emails, {
+            'StartTime': response['EventStart'],
+            'EndTime': response['EventEnd'],
+            'NumAttendees': len(attendee_emails),
+            'Attendees': attendee_emails,
+            'Summary': response.get('Subject') or 'Meeting'
+        })
@@ -0,0 +1,160 @@
+import time
+from bisect import bisect_left
+from typing import Dict, List
+
+from busy_index import MEETING_BUFFER_SECONDS
+from config import AGENT_CONFIG
+from metrics import timed
+from schedule_types import Slot
+
+# Placing a meeting is worth more than any achievable preference gain, so the
+# objective first maximises meetings placed and then their total preference
+PLACEMENT_VALUE = 10.0
+DAY_OFFSET_PENALTY = 0.1
+
+
+class BatchSolver:
+    """Places a batch of meetings jointly by branch and bound.
+
+    Each problem is a dict with the request's 'attendees' and its candidate
+    'slots' (Slot objects already free for every attendee, scored in
+    overall_score). Two meetings conflict when they share an attendee and
+    their intervals come within the meeting buffer. A greedy pass, most
+    constrained request first, gives the warm start; the search then improves
+    on it until it proves optimality or runs out of time_limit_ms.
+
+    Meetings placed for one attendee never conflict with each other, so each
+    attendee's placements are kept as start and end lists sorted together and
+    a conflict check is a single bisect.
+    """
+
+    def __init__(self, time_limit_ms: float = None, buffer_seconds: int = MEETING_BUFFER_SECONDS):
+        self.time_limit = (time_limit_ms if time_limit_ms is not None
+                           else AGENT_CONFIG['solver_time_limit_ms']) / 1000
+        self.buffer_seconds = buffer_seconds
+
+    def slot_value(self, slot: Slot) -> float:
+        return PLACEMENT_VALUE + slot.overall_score - DAY_OFFSET_PENALTY * slot.day_offset
+
+    def _conflicts(self, busy: Dict[str, tuple], attendees: List[str], slot: Slot) -> bool:
+        for email in attendees:
+            placed = busy.get(email)
+            if not placed:
+                continue
+            starts, ends = placed
+            before = bisect_left(starts, slot.end + self.buffer_seconds)
+            if before and ends[before - 1] + self.buffer_seconds > slot.start:
+                return True
+        return False
+
+    def _place(self, busy: Dict[str, tuple], attendees: List[str], slot: Slot):
+        for email in attendees:
+            starts, ends = busy.setdefault(email, ([], []))
+            position = bisect_left(starts, slot.start)
+            starts.insert(position, slot.start)
+            ends.insert(position, slot.end)
+
+    def _unplace(self, busy: Dict[str, tuple], attendees: List[str], slot: Slot):
+        for email in attendees:
+            starts, ends = busy[email]
+            position = bisect_left(starts, slot.start)
+            del starts[position]
+            del ends[position]
+
+    def _greedy(self, problems: List[Dict], order: List[int], candidates: List[List[Slot]]) -> List[Slot]:
+        assignments = [None] * len(problems)
+        busy = {}
+        for index in order:
+            attendees = problems[index]['attendees']
+            for slot in candidates[index]:
+                if not self._conflicts(busy, attendees, slot):
+                    assignments[index] = slot
+                    self._place(busy, attendees, slot)
+                    break
+        return assignments
+
+    def _objective(self, assignments: List[Slot]) -> float:
+        return sum(self.slot_value(slot) for slot in assignments if slot is not None)
+
+    @timed('batch_solve')
+    def solve(self, problems: List[Dict]) -> Dict:
+        started = time.perf_counter()
+        deadline = started + self.time_limit
+
+        candidates = [sorted(problem['slots'], key=lambda slot: (-self.slot_value(slot), slot.start))
+                      for problem in problems]
+        order = sorted(range(len(problems)), key=lambda index: (len(candidates[index]), index))
+
+        incumbent = self._greedy(problems, order, candidates)
+        warm_start_objective = self._objective(incumbent)
+
+        # Best objective still reachable from depth k if every remaining request
+        # got its best slot regardless of conflicts
+        bounds = [0.0] * (len(order) + 1)
+        for depth in range(len(order) - 1, -1, -1):
+            options = candidates[order[depth]]
+            bounds[depth] = bounds[depth + 1] + (self.slot_value(options[0]) if options else 0.0)
+
+        best, best_assignments = warm_start_objective, incumbent
+        nodes, timed_out = 0, False
+
+        # Depth-first search as an explicit loop (batches can be deeper than the
+        # recursion limit). At each depth the options are the request's
+        # candidates in value order, then leaving it unplaced.
+        current = [None] * len(problems)
+        busy = {}
+        next_option = [0] * len(order)
+        values = [0.0] * (len(order) + 1)
+        depth, entering = 0, bounds[0] > warm_start_objective + 1e-9
+        if not entering:
+            depth = -1
+
+        while depth >= 0:
+            if entering:
+                nodes += 1
+                if nodes % 256 == 0 and time.perf_counter() > deadline:
+                    timed_out = True
+                    break
+                if values[depth] + bounds[depth] <= best + 1e-9:
+                    depth, entering = depth - 1, False
+                    continue
+                if depth == len(order):
+                    best, best_assignments = values[depth], list(current)
+                    depth, entering = depth - 1, False
+                    continue
+                next_option[depth] = 0
+
+            index = order[depth]
+            attendees = problems[index]['attendees']
+            if current[index] is not None:
+                self._unplace(busy, attendees, current[index])
+                current[index] = None
+
+            options = candidates[index]
+            option = next_option[depth]
+            while option < len(options) and self._conflicts(busy, attendees, options[option]):
+                option += 1
+            next_option[depth] = option + 1
+
+            if option < len(options):
+                slot = options[option]
+                current[index] = slot
+                self._place(busy, attendees, slot)
+                values[depth + 1] = values[depth] + self.slot_value(slot)
+                depth, entering = depth + 1, True
+            elif option == len(options):
+                values[depth + 1] = values[depth]
+                depth, entering = depth + 1, True
+            else:
+                depth, entering = depth - 1, False
+
+        assignments = best_assignments
+        return {
+            'assignments': assignments,
+            'status': 'time_limit' if timed_out else 'optimal',
+            'objective': round(best, 4),
+            'warm_start_objective': round(warm_start_objective, 4),
+            'placed': sum(1 for slot in assignments if slot is not None),
+            'nodes': nodes,
+            'solve_time_ms': round((time.perf_counter() - started) * 1000, 3)
+        }
@@ -0,0 +1,124 @@
+"""
+Benchmark CalendarService.find_available_slots against the original per-slot scan
+
+    python -m benchmarks.bench_calendar_slots --attendees 20 --days 30
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import pytz
+
+from calendar_service import CalendarService
+
+
+def reference_find_available_slots(service: CalendarService,
+                                   participants: List[str],
+                                   start_date: str,
+                                   end_date: str,
+                                   duration_minutes: int,
+                                   existing_events: Dict[str, List[Dict]] = None) -> List[Dict]:
+    """The pre-bitmap implementation: 15-minute steps x participants x events"""
+
+    start_dt = datetime.fromisoformat(start_date)
+    end_dt = datetime.fromisoformat(end_date)
+    if start_dt.tzinfo is None:
+        start_dt = service.timezone.localize(start_dt)
+    if end_dt.tzinfo is None:
+        end_dt = service.timezone.localize(end_dt)
+
+    available_slots = []
+    current_time = start_dt
+    while current_time + timedelta(minutes=duration_minutes) <= end_dt:
+        slot_end = current_time + timedelta(minutes=duration_minutes)
+        if service._is_within_working_hours(current_time, existing_events, participants):
+            has_conflict = False
+            if existing_events:
+                for participant in participants:
+                    if service._has_participant_conflict(participant, current_time, slot_end, existing_events):
+                        has_conflict = True
+                        break
+            if not has_conflict:
+                available_slots.append({
+                    'start_time': current_time.isoformat(),
+                    'end_time': slot_end.isoformat(),
+                    'duration_minutes': duration_minutes,
+                    'participants': participants.copy()
+                })
+        current_time += timedelta(minutes=15)
+    return available_slots
+
+
+def generate_calendars(attendees: int, days: int, start: datetime, meetings_per_day: int = 4,
+                       seed: int = 7) -> Dict[str, List[Dict]]:
+    rng = random.Random(seed)
+    calendars = {}
+    for i in range(attendees):
+        events = []
+        for day in range(days):
+            day_start = start + timedelta(days=day)
+            events.append({
+                'StartTime': day_start.isoformat(),
+                'EndTime': (day_start + timedelta(hours=9)).isoformat(),
+                'Summary': 'Off Hours'
+            })
+            for _ in range(rng.randint(0, meetings_per_day)):
+                meeting_start = day_start + timedelta(hours=9, minutes=rng.randrange(0, 540, 15))
+                events.append({
+                    'StartTime': meeting_start.isoformat(),
+                    'EndTime': (meeting_start + timedelta(minutes=rng.choice([15, 30, 60]))).isoformat(),
+                    'Summary': 'Meeting'
+                })
+            events.append({
+                'StartTime': (day_start + timedelta(hours=18)).isoformat(),
+                'EndTime': (day_start + timedelta(hours=23, minutes=59, seconds=59)).isoformat(),
+                'Summary': 'Off Hours'
+            })
+        calendars[f"user{i}@company.com"] = events
+    return calendars
+
+
+def time_call(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--attendees', type=int, default=20)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--duration', type=int, default=30)
+    parser.add_argument('--meetings-per-day', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    service = CalendarService()
+    start = pytz.timezone('Asia/Kolkata').localize(datetime(2025, 7, 14))
+    end = start + timedelta(days=args.days)
+    calendars = generate_calendars(args.attendees, args.days, start, args.meetings_per_day)
+    participants = list(calendars)
+    call_args = (participants, start.isoformat(), end.isoformat(), args.duration, calendars)
+
+    bitmap_slots = service.find_available_slots(*call_args)
+    reference_slots = reference_find_available_slots(service, *call_args)
+    assert bitmap_slots == reference_slots, "bitmap engine disagrees with the reference scan"
+
+    bitmap_time = time_call(lambda: service.find_available_slots(*call_args), args.repeat)
+    reference_time = time_call(lambda: reference_find_available_slots(service, *call_args), args.repeat)
+
+    print(f"{args.attendees} attendees, {args.days} days, "
+          f"{sum(len(e) for e in calendars.values())} events, {len(bitmap_slots)} free slots")
+    print(f"  reference scan: {reference_time * 1000:9.1f} ms")
+    print(f"  bitmap engine:  {bitmap_time * 1000:9.1f} ms")
+    print(f"  speedup:        {reference_time / bitmap_time:9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+"""
+Latency and allocation benchmarks for the scheduling pipeline on synthetic calendars
+
+    python -m benchmarks.bench_pipeline --attendees 2 10 50 --density 0.4 --output bench.json
+    python -m benchmarks.bench_pipeline --compare bench.json
+
+schedule_meeting runs end to end against the mock LLM and a replayed Google
+Calendar; find_available_slots, _find_common_slots_fixed and _has_conflict are
+timed on their own. Results (p50/p95/p99 in ms, allocations from tracemalloc)
+are written as JSON so runs from different commits can be compared.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List
+
+import pytz
+
+from benchmarks.synthetic_calendars import attendee_timezones, generate_attendee_calendars
+from tests.google_replay import recordings_from_mock_events, replay_factory
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    index = max(0, min(len(sorted_samples) - 1, round(pct / 100 * len(sorted_samples) + 0.5) - 1))
+    return sorted_samples[index]
+
+
+def measure(fn: Callable, iterations: int, warmup: int = 2) -> Dict:
+    """Time fn over iterations, then run it once more under tracemalloc."""
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = [stat for stat in after.compare_to(before, 'filename') if stat.size_diff > 0]
+
+    result = {'iterations': iterations, 'mean_ms': sum(samples) / len(samples)}
+    for pct in PERCENTILES:
+        result[f"p{pct}_ms"] = percentile(samples, pct)
+    result['alloc_peak_bytes'] = peak
+    result['alloc_retained_bytes'] = sum(stat.size_diff for stat in allocated)
+    result['alloc_retained_blocks'] = sum(stat.count_diff for stat in allocated)
+    return result
+
+
+def bench_participant(calendars: Dict[str, List[Dict]], timezones: Dict[str, str], target_date: date,
+                      iterations: int, rng: random.Random) -> Dict:
+    from llm_service import get_llm_service
+    from participant_agent import ParticipantAgent
+
+    email = next(iter(calendars))
+    preferences = {'preferred_times': ['morning'], 'avoid_lunch': True, 'seniority_weight': 0.5,
+                   'timezone': timezones[email]}
+    agent = ParticipantAgent(email, calendars[email], preferences, get_llm_service({'use_mock': True}))
+    date_str = target_date.isoformat()
+
+    tz = pytz.timezone(timezones[email])
+    day_start = tz.localize(datetime.combine(target_date, datetime.min.time()))
+    probes = []
+    for _ in range(100):
+        start = day_start + timedelta(minutes=rng.randrange(0, 24 * 60, 15))
+        probes.append((start, start + timedelta(minutes=30)))
+
+    def has_conflict_probes():
+        for start, end in probes:
+            agent._has_conflict(start, end)
+
+    return {
+        'find_available_slots': measure(lambda: agent.find_available_slots(date_str, 30), iterations),
+        'has_conflict_x100': measure(has_conflict_probes, iterations)
+    }
+
+
+def bench_common_slots(calendars: Dict[str, List[Dict]], timezones: Dict[str, str], target_date: date,
+                       iterations: int) -> Dict:
+    from llm_service import get_llm_service
+    from negotiator_agent import NegotiatorAgent
+    from participant_agent import ParticipantAgent
+
+    llm = get_llm_service({'use_mock': True})
+    negotiator = NegotiatorAgent(llm)
+    all_slots = {}
+    for email, events in calendars.items():
+        preferences = {'preferred_times': ['morning', 'afternoon'], 'avoid_lunch': False,
+                       'seniority_weight': 0.5, 'timezone': timezones[email]}
+        agent = ParticipantAgent(email, events, preferences, llm)
+        all_slots[email] = agent.available_slots(target_date.isoformat(), 30)
+
+    return {'find_common_slots_fixed': measure(lambda: negotiator._find_common_slots_fixed(all_slots, 'medium'),
+                                               iterations)}
+
+
+def bench_schedule_meeting(calendars: Dict[str, List[Dict]], start_date: date, iterations: int,
+                           cold_calendars: bool) -> Dict:
+    import coordinator_agent
+    from llm_service import get_llm_service
+
+    coordinator_agent.calendar_fetcher.service_factory = replay_factory(recordings_from_mock_events(calendars))
+    for email in calendars:
+        coordinator_agent.calendar_fetcher.invalidate(email)
+        coordinator_agent.calendar_store.invalidate(email)
+
+    coordinator = coordinator_agent.CoordinatorAgent(get_llm_service({'use_mock': True}))
+    emails = list(calendars)
+    request = {
+        'Request_id': 'bench',
+        'Datetime': (start_date - timedelta(days=1)).strftime('%d-%m-%Y') + 'T09:00:00',
+        'Location': 'IIT Mumbai',
+        'From': emails[0],
+        'Attendees': [{'email': email} for email in emails[1:]],
+        'Subject': 'Benchmark',
+        'EmailContent': f"Hi team, let's meet {start_date.strftime('%A')} for 30 minutes to review progress."
+    }
+
+    loop = asyncio.new_event_loop()
+
+    def schedule():
+        if cold_calendars:
+            for email in emails:
+                coordinator_agent.calendar_store.invalidate(email)
+        return loop.run_until_complete(coordinator.schedule_meeting(dict(request)))
+
+    try:
+        result = measure(schedule, iterations)
+        result['scheduled'] = bool(schedule().get('EventStart'))
+    finally:
+        loop.close()
+    return {'schedule_meeting': result}
+
+
+def run_benchmarks(args) -> Dict:
+    start_date = date.fromisoformat(args.start_date)
+    results = {}
+
+    for attendees in args.attendees:
+        calendars = generate_attendee_calendars(attendees, args.days, start_date, args.density, args.timezones,
+                                                off_hours=not args.no_off_hours, seed=args.seed)
+        timezones = attendee_timezones(attendees, args.timezones)
+        rng = random.Random(args.seed)
+
+        runs = {}
+        runs.update(bench_participant(calendars, timezones, start_date, args.iterations, rng))
+        runs.update(bench_common_slots(calendars, timezones, start_date, args.iterations))
+        runs.update(bench_schedule_meeting(calendars, start_date, args.e2e_iterations, args.cold_calendars))
+        results[f"attendees_{attendees}"] = runs
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'params': {
+                'attendees': args.attendees,
+                'days': args.days,
+                'density': args.density,
+                'timezones': args.timezones,
+                'off_hours': not args.no_off_hours,
+                'iterations': args.iterations,
+                'e2e_iterations': args.e2e_iterations,
+                'cold_calendars': args.cold_calendars,
+                'seed': args.seed
+            }
+        },
+        'results': results
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict, current: Dict):
+    print(f"{'benchmark':48} {'base p50':>10} {'p50':>10} {'change':>8}")
+    for group, runs in current['results'].items():
+        for name, result in runs.items():
+            base = baseline['results'].get(group, {}).get(name)
+            label = f"{group}/{name}"
+            if base is None:
+                print(f"{label:48} {'-':>10} {result['p50_ms']:10.3f} {'new':>8}")
+                continue
+            change = (result['p50_ms'] - base['p50_ms']) / base['p50_ms'] * 100 if base['p50_ms'] else 0.0
+            print(f"{label:48} {base['p50_ms']:10.3f} {result['p50_ms']:10.3f} {change:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--attendees', type=int, nargs='+', default=[2, 10, 50])
+    parser.add_argument('--days', type=int, default=5)
+    parser.add_argument('--density', type=float, default=0.3)
+    parser.add_argument('--timezones', nargs='+', default=['Asia/Kolkata', 'Europe/London'])
+    parser.add_argument('--no-off-hours', action='store_true')
+    parser.add_argument('--start-date', default='2025-07-17')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--e2e-iterations', type=int, default=20)
+    parser.add_argument('--cold-calendars', action='store_true',
+                        help='drop cached calendars before every schedule_meeting run')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='write results JSON here (default: stdout)')
+    parser.add_argument('--compare', help='baseline results JSON to compare p50 against')
+    args = parser.parse_args()
+
+    # The pipeline prints its reasoning; keep it out of the measurements' output
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        report = run_benchmarks(args)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Wrote {args.output}")
+    elif not args.compare:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
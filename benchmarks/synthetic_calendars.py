@@ -0,0 +1,93 @@
+"""
+Synthetic attendee calendars in the scheduler's event format
+
+    calendars = generate_attendee_calendars(attendees=10, days=5, start_date=date(2025, 7, 14),
+                                            density=0.4, timezones=['Asia/Kolkata', 'Europe/London'])
+"""
+
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+import pytz
+
+MIN_ATTENDEES = 2
+MAX_ATTENDEES = 50
+
+DEFAULT_TIMEZONES = ['Asia/Kolkata']
+
+MEETING_SUMMARIES = ['Team Sync', 'Project Review', '1:1', 'Customer Call', 'Design Review', 'Planning']
+
+
+def attendee_emails(count: int) -> List[str]:
+    return [f"bench{i:02d}.amd@gmail.com" for i in range(count)]
+
+
+def generate_attendee_calendars(attendees: int, days: int, start_date: date, density: float = 0.3,
+                                timezones: List[str] = None, off_hours: bool = True, working_start_hour: int = 9,
+                                working_end_hour: int = 18, seed: int = 7) -> Dict[str, List[Dict]]:
+    """Calendars for attendees, each in one of timezones (assigned round-robin).
+
+    density is the share of each day's working hours taken by meetings; meetings
+    are 30 or 60 minutes long on half-hour boundaries. Off Hours blocks cover
+    midnight to the start of the working day and its end to midnight.
+    """
+    if not MIN_ATTENDEES <= attendees <= MAX_ATTENDEES:
+        raise ValueError(f"attendees must be between {MIN_ATTENDEES} and {MAX_ATTENDEES}")
+    if not 0 <= density <= 1:
+        raise ValueError("density must be between 0 and 1")
+
+    rng = random.Random(seed)
+    timezones = [pytz.timezone(name) for name in (timezones or DEFAULT_TIMEZONES)]
+    half_hours = (working_end_hour - working_start_hour) * 2
+
+    calendars = {}
+    for index, email in enumerate(attendee_emails(attendees)):
+        tz = timezones[index % len(timezones)]
+        events = []
+
+        for day in range(days):
+            day_start = tz.localize(datetime.combine(start_date + timedelta(days=day), datetime.min.time()))
+            working_start = day_start + timedelta(hours=working_start_hour)
+
+            if off_hours:
+                events.append(_event(day_start, working_start, 'Off Hours'))
+
+            free = set(range(half_hours))
+            booked_target = round(half_hours * density)
+            booked = 0
+            while booked < booked_target and free:
+                slot = rng.choice(sorted(free))
+                length = 2 if rng.random() < 0.3 and slot + 1 in free and booked + 2 <= booked_target else 1
+                meeting_start = working_start + timedelta(minutes=30 * slot)
+                events.append(_event(meeting_start, meeting_start + timedelta(minutes=30 * length),
+                                     rng.choice(MEETING_SUMMARIES)))
+                free.difference_update(range(slot, slot + length))
+                booked += length
+
+            if off_hours:
+                events.append(_event(
+                    day_start + timedelta(hours=working_end_hour),
+                    day_start + timedelta(hours=23, minutes=59, seconds=59),
+                    'Off Hours'
+                ))
+
+        events.sort(key=lambda event: event['StartTime'])
+        calendars[email] = events
+
+    return calendars
+
+
+def attendee_timezones(attendees: int, timezones: List[str] = None) -> Dict[str, str]:
+    timezones = timezones or DEFAULT_TIMEZONES
+    return {email: timezones[index % len(timezones)] for index, email in enumerate(attendee_emails(attendees))}
+
+
+def _event(start: datetime, end: datetime, summary: str) -> Dict:
+    return {
+        'StartTime': start.isoformat(),
+        'EndTime': end.isoformat(),
+        'NumAttendees': 1,
+        'Attendees': ['SELF'],
+        'Summary': summary
+    }
@@ -0,0 +1,104 @@
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import List, Dict, Optional
+from schedule_types import Event, to_epoch
+
+MEETING_BUFFER_SECONDS = 10 * 60
+OFF_HOURS_BUFFER_SECONDS = 5 * 60
+
+
+class BusyIntervalIndex:
+    """Sorted busy intervals of one calendar, parsed once into UTC epoch seconds.
+
+    Each event is kept twice: as its raw [start, end) interval, used to name the
+    conflicting event, and widened by its buffer (5 min for Off Hours, 10 min
+    otherwise), used for availability checks. Both lists are sorted by start and
+    carry a running maximum of the end, so an overlap query is a pair of bisects.
+    """
+
+    def __init__(self, events: List[Dict]):
+        self.events = events
+        self._entries = [Event.from_dict(event) for event in events]
+        self._rebuild()
+
+    def _buffer(self, event: Event) -> int:
+        return OFF_HOURS_BUFFER_SECONDS if event.off_hours else MEETING_BUFFER_SECONDS
+
+    def _rebuild(self):
+        raw = sorted(self._entries, key=lambda event: (event.start, event.end))
+        self._raw_starts = [event.start for event in raw]
+        self._raw_ends = [event.end for event in raw]
+        self._raw_max_ends = list(accumulate(self._raw_ends, max))
+        self._raw_events = [event.source for event in raw]
+
+        buffered = sorted(
+            (event.start - self._buffer(event), event.end + self._buffer(event)) for event in self._entries
+        )
+        self._buffered_starts = [entry[0] for entry in buffered]
+        self._buffered_ends = [entry[1] for entry in buffered]
+        self._buffered_max_ends = list(accumulate(self._buffered_ends, max))
+
+    def add(self, event: Dict):
+        """Record a newly placed event (also appended to the events list).
+
+        The event is inserted into both sorted lists in place; only the running
+        maximum after the insertion point is patched, and only until it already
+        exceeds the new end.
+        """
+        self.events.append(event)
+        entry = Event.from_dict(event)
+        self._entries.append(entry)
+
+        position = self._insert(self._raw_starts, self._raw_ends, self._raw_max_ends, entry.start, entry.end)
+        self._raw_events.insert(position, event)
+
+        buffer = self._buffer(entry)
+        self._insert(self._buffered_starts, self._buffered_ends, self._buffered_max_ends,
+                     entry.start - buffer, entry.end + buffer)
+
+    def _insert(self, starts: List[int], ends: List[int], max_ends: List[int], start: int, end: int) -> int:
+        # Same position a stable sort on (start, end) would give the new interval
+        low = bisect_left(starts, start)
+        high = bisect_right(starts, start, low)
+        position = bisect_right(ends, end, low, high)
+
+        starts.insert(position, start)
+        ends.insert(position, end)
+        max_ends.insert(position, max(max_ends[position - 1], end) if position else end)
+
+        index = position + 1
+        while index < len(max_ends) and max_ends[index] < end:
+            max_ends[index] = end
+            index += 1
+        return position
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def has_conflict(self, start: int, end: int) -> bool:
+        """True if [start, end) touches any event once its buffer is applied."""
+        candidates = bisect_left(self._buffered_starts, end)
+        return candidates > 0 and self._buffered_max_ends[candidates - 1] > start
+
+    def conflicts_many(self, starts: List[int], duration: int) -> List[bool]:
+        """has_conflict for each of the ascending starts, in one sweep over the index."""
+        conflicts = []
+        candidates = 0
+        total = len(self._buffered_starts)
+        for start in starts:
+            end = start + duration
+            while candidates < total and self._buffered_starts[candidates] < end:
+                candidates += 1
+            conflicts.append(candidates > 0 and self._buffered_max_ends[candidates - 1] > start)
+        return conflicts
+
+    def first_overlap(self, start: int, end: int) -> Optional[Dict]:
+        """Earliest-starting event whose unbuffered interval overlaps [start, end)."""
+        candidates = bisect_left(self._raw_starts, end)
+        first = bisect_right(self._raw_max_ends, start)
+        if first < candidates:
+            return self._raw_events[first]
+        return None
+
+    def off_hours_intervals(self) -> List[tuple]:
+        return [(event.start, event.end) for event in self._entries if event.off_hours]
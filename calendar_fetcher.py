@@ -0,0 +1,355 @@
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+from typing import List, Dict, Any
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+from config import CALENDAR_CONFIG
+from metrics import timed
+
+BUSY_SUMMARY = "Busy"
+BATCH_LIMIT = 50
+
+
+class SyncTokenExpired(Exception):
+    """Google answered 410 Gone: the sync token is no longer valid."""
+
+
+class CalendarFetcher:
+    """Google Calendar reads with one built service per user token.
+
+    Credentials and the discovery client are created on first use and kept for
+    the life of the process; the token is only refreshed once it has expired.
+    A per-user lock serializes access to each (non thread-safe) service, while
+    fetch_many spreads different attendees across a bounded thread pool.
+
+    fetch_mode selects how fetch_many and sync_many talk to Google:
+      events   - one events().list per attendee, run concurrently
+      batch    - the same events().list calls combined into batch HTTP requests
+                 (for sync_many too, where "events" and "freebusy" sync per user)
+      freebusy - one freebusy.query for all attendees; busy blocks come back as
+                 "Busy" events and fetch_event_detail fills one in on demand
+    service_factory(user) replaces the Google client, e.g. with the replay
+    stand-in in tests/google_replay.py.
+    """
+
+    def __init__(self, keys_dir: str = None, max_workers: int = None, fetch_mode: str = None, service_factory=None):
+        self.keys_dir = keys_dir or CALENDAR_CONFIG['keys_dir']
+        self.max_workers = max_workers or CALENDAR_CONFIG['fetch_workers']
+        self.fetch_mode = fetch_mode or CALENDAR_CONFIG['fetch_mode']
+        self.service_factory = service_factory
+        self._clients = {}
+        self._user_locks = {}
+        self._locks_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="calendar-fetch")
+
+    def _token_path(self, user: str) -> str:
+        return os.path.join(self.keys_dir, user.split("@")[0] + ".token")
+
+    def _user_lock(self, user: str) -> threading.Lock:
+        with self._locks_lock:
+            lock = self._user_locks.get(user)
+            if lock is None:
+                lock = threading.Lock()
+                self._user_locks[user] = lock
+            return lock
+
+    def _get_service(self, user: str):
+        """Cached service for user; call with the user's lock held."""
+        client = self._clients.get(user)
+
+        if client is None:
+            if self.service_factory is not None:
+                creds, service = None, self.service_factory(user)
+            else:
+                creds = Credentials.from_authorized_user_file(self._token_path(user))
+                service = build("calendar", "v3", credentials=creds, cache_discovery=False)
+            client = (creds, service)
+            self._clients[user] = client
+
+        creds, service = client
+        if creds is not None and not creds.valid and creds.refresh_token:
+            creds.refresh(Request())
+
+        return service
+
+    def invalidate(self, user: str):
+        with self._user_lock(user):
+            self._clients.pop(user, None)
+
+    def _list_request(self, service, start: str, end: str):
+        return service.events().list(
+            calendarId='primary',
+            timeMin=start,
+            timeMax=end,
+            singleEvents=True,
+            orderBy='startTime'
+        )
+
+    @timed('calendar_fetch', path='events')
+    def fetch_events(self, user: str, start: str, end: str) -> List[Dict]:
+        events_list = []
+        try:
+            with self._user_lock(user):
+                calendar_service = self._get_service(user)
+                events_result = self._list_request(calendar_service, start, end).execute()
+            events = events_result.get('items', [])
+
+            events_list = self.convert_events(events, start, end)
+
+        except Exception as e:
+            print(f"Failed to retrieve calendar for {user}: {e}")
+            self.invalidate(user)
+            events_list = []
+
+        print(f"Retrieved {len(events_list)} events for {user}")
+        return events_list
+
+    def sync_events(self, user: str, time_min: str = None, time_max: str = None, sync_token: str = None):
+        """Raw event items plus the next sync token.
+
+        Without sync_token this is a full sync of [time_min, time_max); with it
+        only events changed since that token come back (cancelled ones with
+        status 'cancelled'). Raises SyncTokenExpired when Google returns 410.
+        """
+        if sync_token:
+            params = {'syncToken': sync_token}
+        else:
+            params = {'timeMin': time_min, 'timeMax': time_max}
+
+        items = []
+        page_token = None
+        with self._user_lock(user):
+            service = self._get_service(user)
+            while True:
+                try:
+                    response = service.events().list(
+                        calendarId='primary',
+                        singleEvents=True,
+                        pageToken=page_token,
+                        **params
+                    ).execute()
+                except Exception as e:
+                    if getattr(getattr(e, 'resp', None), 'status', None) == 410:
+                        raise SyncTokenExpired(str(e))
+                    raise
+
+                items.extend(response.get('items', []))
+                page_token = response.get('nextPageToken')
+                if not page_token:
+                    return items, response.get('nextSyncToken')
+
+    def map_users(self, call, users: List[str]) -> Dict[str, Any]:
+        """Run call(user) for every user on the fetch thread pool."""
+        if len(users) <= 1:
+            return {user: call(user) for user in users}
+        # Each worker runs in a copy of the caller's context so request-scoped
+        # state (metrics, reasoning) follows the fetch
+        contexts = [contextvars.copy_context() for _ in users]
+        return dict(zip(users, self._executor.map(lambda context, user: context.run(call, user), contexts, users)))
+
+    def fetch_many(self, users: List[str], start: str, end: str) -> Dict[str, List[Dict]]:
+        """Fetch every user's events for [start, end) using fetch_mode."""
+        if self.fetch_mode == 'freebusy' and users:
+            return self._fetch_freebusy(users, start, end)
+        if self.fetch_mode == 'batch' and len(users) > 1:
+            return self._fetch_batched(users, start, end)
+        return self._fetch_concurrently(users, start, end)
+
+    def _fetch_concurrently(self, users: List[str], start: str, end: str) -> Dict[str, List[Dict]]:
+        return self.map_users(lambda user: self.fetch_events(user, start, end), users)
+
+    def _batch_responses(self, users: List[str], build_request):
+        """Send build_request(service) for every user as batch HTTP requests.
+
+        Returns the responses by user and the users whose request failed.
+        """
+        responses = {}
+        failed = []
+
+        def on_response(request_id, response, exception):
+            if exception is not None:
+                print(f"Failed to retrieve calendar for {request_id}: {exception}")
+                failed.append(request_id)
+            else:
+                responses[request_id] = response
+
+        for offset in range(0, len(users), BATCH_LIMIT):
+            chunk = users[offset:offset + BATCH_LIMIT]
+            try:
+                with ExitStack() as stack:
+                    for user in sorted(chunk):
+                        stack.enter_context(self._user_lock(user))
+
+                    batch = None
+                    for user in chunk:
+                        try:
+                            service = self._get_service(user)
+                        except Exception as e:
+                            print(f"Failed to retrieve calendar for {user}: {e}")
+                            failed.append(user)
+                            continue
+                        if batch is None:
+                            batch = service.new_batch_http_request(callback=on_response)
+                        batch.add(build_request(service), request_id=user)
+
+                    if batch is not None:
+                        batch.execute()
+            except Exception as e:
+                print(f"Batch calendar request failed: {e}")
+                failed.extend(user for user in chunk if user not in responses and user not in failed)
+
+        return responses, failed
+
+    @timed('calendar_fetch', path='batch')
+    def _fetch_batched(self, users: List[str], start: str, end: str) -> Dict[str, List[Dict]]:
+        responses, failed = self._batch_responses(users, lambda service: self._list_request(service, start, end))
+
+        results = {}
+        for user, response in responses.items():
+            results[user] = self.convert_events(response.get('items', []), start, end)
+            print(f"Retrieved {len(results[user])} events for {user}")
+
+        for user in failed:
+            self.invalidate(user)
+            results[user] = []
+
+        return {user: results.get(user, []) for user in users}
+
+    def sync_many(self, users: List[str], time_min: str, time_max: str) -> Dict[str, Any]:
+        """Full syncs of [time_min, time_max) for every user, using fetch_mode.
+
+        Each value is sync_events' (items, sync_token), or the exception it
+        raised. In batch mode the first page of every calendar goes out as
+        batch HTTP requests; calendars with more pages, and users whose part of
+        the batch failed, are then synced one by one.
+        """
+        results = {}
+        pending = users
+        if self.fetch_mode == 'batch' and len(users) > 1:
+            responses, pending = self._batch_responses(users, lambda service: service.events().list(
+                calendarId='primary',
+                singleEvents=True,
+                timeMin=time_min,
+                timeMax=time_max
+            ))
+            for user, response in responses.items():
+                if response.get('nextPageToken'):
+                    pending.append(user)
+                else:
+                    results[user] = (response.get('items', []), response.get('nextSyncToken'))
+
+        results.update(self.map_users(lambda user: self._sync_or_error(user, time_min, time_max), pending))
+        return {user: results[user] for user in users}
+
+    def _sync_or_error(self, user: str, time_min: str, time_max: str):
+        try:
+            return self.sync_events(user, time_min, time_max)
+        except Exception as e:
+            return e
+
+    @timed('calendar_fetch', path='freebusy')
+    def _fetch_freebusy(self, users: List[str], start: str, end: str) -> Dict[str, List[Dict]]:
+        query_user = users[0]
+        try:
+            with self._user_lock(query_user):
+                service = self._get_service(query_user)
+                response = service.freebusy().query(body={
+                    'timeMin': start,
+                    'timeMax': end,
+                    'items': [{'id': user} for user in users]
+                }).execute()
+        except Exception as e:
+            print(f"Free/busy query failed, fetching events instead: {e}")
+            self.invalidate(query_user)
+            return self._fetch_concurrently(users, start, end)
+
+        results = {}
+        fallback = []
+        calendars = response.get('calendars', {})
+
+        for user in users:
+            calendar = calendars.get(user)
+            if calendar is None or calendar.get('errors'):
+                fallback.append(user)
+                continue
+            results[user] = self._convert_busy_blocks(calendar.get('busy', []), start, end)
+            print(f"Retrieved {len(results[user])} busy blocks for {user}")
+
+        if fallback:
+            results.update(self._fetch_concurrently(fallback, start, end))
+
+        return {user: results[user] for user in users}
+
+    def fetch_event_detail(self, user: str, event: Dict) -> Dict:
+        """Replace a free/busy placeholder with the real event it covers, in place."""
+        if event.get('Summary') != BUSY_SUMMARY:
+            return event
+
+        detailed = self.fetch_events(user, event['StartTime'], event['EndTime'])
+        if detailed:
+            event.update(detailed[0])
+        return event
+
+    def _convert_busy_blocks(self, busy_blocks: List[Dict], start: str, end: str = None) -> List[Dict]:
+        events_list = []
+        start_dt = datetime.fromisoformat(start.replace('Z', '+00:00'))
+        first_date = start_dt.date()
+        last_date = datetime.fromisoformat(end.replace('Z', '+00:00')).date() if end else first_date
+
+        for block in busy_blocks:
+            event_start = datetime.fromisoformat(block['start'].replace('Z', '+00:00')).astimezone(start_dt.tzinfo)
+            event_end = datetime.fromisoformat(block['end'].replace('Z', '+00:00')).astimezone(start_dt.tzinfo)
+
+            if not (event_end.date() < first_date or event_start.date() > last_date):
+                events_list.append({
+                    "StartTime": event_start.isoformat(),
+                    "EndTime": event_end.isoformat(),
+                    "NumAttendees": 1,
+                    "Attendees": ["SELF"],
+                    "Summary": BUSY_SUMMARY
+                })
+
+        events_list.sort(key=lambda x: x["StartTime"])
+        return events_list
+
+    def convert_events(self, events: List[Dict], start: str, end: str = None) -> List[Dict]:
+        events_list = []
+        start_dt = datetime.fromisoformat(start.replace('Z', '+00:00'))
+        first_date = start_dt.date()
+        last_date = datetime.fromisoformat(end.replace('Z', '+00:00')).date() if end else first_date
+
+        for event in events:
+            if 'dateTime' not in event["start"]:
+                # All-day event (start.date only): nothing to block on the clock
+                continue
+
+            attendee_list = []
+            try:
+                for attendee in event["attendees"]:
+                    attendee_list.append(attendee['email'])
+            except:
+                attendee_list.append("SELF")
+
+            start_time = event["start"]["dateTime"]
+            end_time = event["end"]["dateTime"]
+            summary = event["summary"]
+
+            event_start = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+            event_end = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
+
+            if not (event_end.date() < first_date or event_start.date() > last_date):
+                events_list.append({
+                    "StartTime": start_time,
+                    "EndTime": end_time,
+                    "NumAttendees": len(set(attendee_list)),
+                    "Attendees": list(set(attendee_list)),
+                    "Summary": summary
+                })
+
+        events_list.sort(key=lambda x: x["StartTime"])
+        return events_list
@@ -1,7 +1,9 @@
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
+import numpy as np
 import pytz
 from config import CALENDAR_CONFIG
+from busy_index import to_epoch
 
 class CalendarService:
     def __init__(self, config: Dict = None):
@@ -33,36 +35,76 @@ class CalendarService:
         if end_dt.tzinfo is None:
             end_dt = self.timezone.localize(end_dt)
         
-        available_slots = []
-        current_time = start_dt
+        window_minutes = int((end_dt - start_dt).total_seconds() // 60)
+        if duration_minutes > window_minutes:
+            return []
         
-        # Generate 15-minute time slots
-        while current_time + timedelta(minutes=duration_minutes) <= end_dt:
-            slot_end = current_time + timedelta(minutes=duration_minutes)
-            
-            # Check if slot is within working hours (derived from calendar data)
-            if self._is_within_working_hours(current_time, existing_events, participants):
-                
-                # Check conflicts for all participants
-                has_conflict = False
-                if existing_events:
-                    for participant in participants:
-                        if self._has_participant_conflict(participant, current_time, slot_end, existing_events):
-                            has_conflict = True
-                            break
-                
-                if not has_conflict:
-                    available_slots.append({
-                        'start_time': current_time.isoformat(),
-                        'end_time': slot_end.isoformat(),
-                        'duration_minutes': duration_minutes,
-                        'participants': participants.copy()
-                    })
-            
-            current_time += timedelta(minutes=15)
+        # Candidate starts on the 15-minute grid, as minute offsets into the window
+        offsets = np.arange(0, window_minutes - duration_minutes + 1, 15)
+        
+        if existing_events:
+            # Off Hours are ordinary busy minutes here, so one overlap test also
+            # covers the working-hours check
+            busy = self._rasterize_busy(participants, existing_events, start_dt, window_minutes)
+            busy_prefix = np.concatenate(([0], np.cumsum(busy, dtype=np.int32)))
+            feasible = busy_prefix[offsets + duration_minutes] == busy_prefix[offsets]
+        else:
+            feasible = self._business_hours_mask(start_dt, offsets)
+        
+        available_slots = []
+        for offset in offsets[feasible].tolist():
+            slot_start = start_dt + timedelta(minutes=offset)
+            slot_end = slot_start + timedelta(minutes=duration_minutes)
+            available_slots.append({
+                'start_time': slot_start.isoformat(),
+                'end_time': slot_end.isoformat(),
+                'duration_minutes': duration_minutes,
+                'participants': participants.copy()
+            })
         
         return available_slots
     
+    def _rasterize_busy(self,
+                        participants: List[str],
+                        existing_events: Dict[str, List[Dict]],
+                        start_dt: datetime,
+                        window_minutes: int) -> np.ndarray:
+        """Per-minute busy mask for the window, OR-ed over every participant's events"""
+        
+        window_start = start_dt.timestamp()
+        event_starts = []
+        event_ends = []
+        
+        for participant in participants:
+            for event in existing_events.get(participant, []):
+                event_starts.append(to_epoch(event['StartTime']))
+                event_ends.append(to_epoch(event['EndTime']))
+        
+        if not event_starts:
+            return np.zeros(window_minutes, dtype=bool)
+        
+        # A minute is busy if any event covers part of it; slots are whole minutes
+        # of the window, so this is exact rather than an approximation
+        first = np.floor((np.asarray(event_starts) - window_start) / 60).astype(np.int64)
+        last = np.ceil((np.asarray(event_ends) - window_start) / 60).astype(np.int64)
+        first = np.clip(first, 0, window_minutes)
+        last = np.clip(last, 0, window_minutes)
+        keep = first < last
+        
+        coverage = np.zeros(window_minutes + 1, dtype=np.int32)
+        np.add.at(coverage, first[keep], 1)
+        np.add.at(coverage, last[keep], -1)
+        return np.cumsum(coverage[:-1]) > 0
+    
+    def _business_hours_mask(self, start_dt: datetime, offsets: np.ndarray) -> np.ndarray:
+        """Vectorized _is_business_hours for start_dt + offsets minutes (wall clock of start_dt)"""
+        
+        start_second = start_dt.hour * 3600 + start_dt.minute * 60 + start_dt.second
+        seconds = start_second + offsets * 60
+        hours = (seconds // 3600) % 24
+        weekdays = (start_dt.weekday() + seconds // 86400) % 7
+        return (weekdays < 5) & (hours >= 9) & (hours < 18)
+    
     def _is_within_working_hours(self, dt: datetime, existing_events: Dict[str, List[Dict]], participants: List[str]) -> bool:
         """Check if time is within working hours based on calendar Off Hours events"""
         
@@ -0,0 +1,228 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Dict
+from busy_index import to_epoch
+from calendar_fetcher import CalendarFetcher, SyncTokenExpired
+from config import CALENDAR_CONFIG
+from metrics import span
+
+
+class CalendarStore:
+    """Per-user calendar snapshots shared across requests.
+
+    The first read for a user does a full sync of a window_days window starting
+    at the requested range and keeps the raw items with Google's sync token;
+    users synced together go through fetcher.sync_many, so in batch fetch mode
+    their full syncs share batch HTTP requests.
+    Reads within ttl_seconds of the last sync are served from memory; older
+    entries are brought up to date with an incremental syncToken request that
+    only returns changed events. A 410 from Google, or a range outside the
+    synced window, triggers a full resync. At most max_users calendars are
+    kept, least recently used first out.
+    """
+
+    def __init__(self, fetcher: CalendarFetcher, ttl_seconds: float = None, max_users: int = None,
+                 window_days: int = None):
+        self.fetcher = fetcher
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else CALENDAR_CONFIG['store_ttl_seconds']
+        self.max_users = max_users or CALENDAR_CONFIG['store_max_users']
+        self.window_days = window_days or CALENDAR_CONFIG['store_window_days']
+        self.hits = 0
+        self.incremental_syncs = 0
+        self.full_syncs = 0
+        self.evictions = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, users: List[str], start: str, end: str) -> Dict[str, List[Dict]]:
+        start_epoch, end_epoch = to_epoch(start), to_epoch(end)
+        now = time.time()
+        results = {}
+        fresh = {}
+        stale = []
+
+        with self._lock:
+            for user in users:
+                entry = self._entries.get(user)
+                if entry is not None and self._covers(entry, start_epoch, end_epoch) \
+                        and now - entry['synced_at'] < self.ttl_seconds:
+                    self._entries.move_to_end(user)
+                    self.hits += 1
+                    fresh[user] = entry
+                else:
+                    stale.append(user)
+
+        for user, entry in fresh.items():
+            print(f"Using cached calendar data for {user}")
+            try:
+                results[user] = self._select(entry, start, end, start_epoch, end_epoch)
+            except Exception as e:
+                print(f"Failed to read cached calendar for {user}: {e}")
+                self.invalidate(user)
+                results[user] = []
+
+        if stale:
+            results.update(self._refresh_many(stale, start, end))
+
+        return {user: results[user] for user in users}
+
+    def invalidate(self, user: str):
+        with self._lock:
+            self._entries.pop(user, None)
+
+    def _covers(self, entry: Dict, start_epoch: int, end_epoch: int) -> bool:
+        return entry['time_min'] <= start_epoch and end_epoch <= entry['time_max']
+
+    def _select(self, entry: Dict, start: str, end: str, start_epoch: int, end_epoch: int) -> List[Dict]:
+        # All-day items only carry start.date and never block a time slot
+        items = [
+            item for item in entry['items'].values()
+            if 'dateTime' in item['start']
+            and to_epoch(item['start']['dateTime']) < end_epoch and to_epoch(item['end']['dateTime']) > start_epoch
+        ]
+        return self.fetcher.convert_events(items, start, end)
+
+    def _refresh_many(self, users: List[str], start: str, end: str) -> Dict[str, List[Dict]]:
+        start_epoch, end_epoch = to_epoch(start), to_epoch(end)
+
+        with self._lock:
+            warm = [
+                user for user in users
+                if self._can_sync_incrementally(self._entries.get(user), start_epoch, end_epoch)
+            ]
+        cold = [user for user in users if user not in warm]
+
+        results = {}
+        if warm:
+            results.update(self.fetcher.map_users(lambda user: self._refresh(user, start, end), warm))
+        if cold:
+            results.update(self._full_sync_many(cold, start, end))
+        return results
+
+    def _can_sync_incrementally(self, entry: Dict, start_epoch: int, end_epoch: int) -> bool:
+        return entry is not None and bool(entry['sync_token']) and self._covers(entry, start_epoch, end_epoch)
+
+    def _full_sync_many(self, users: List[str], start: str, end: str) -> Dict[str, List[Dict]]:
+        start_epoch, end_epoch = to_epoch(start), to_epoch(end)
+        start_dt, end_dt = self._sync_window(start, end)
+
+        with span('calendar_fetch', path='full_sync'):
+            synced = self.fetcher.sync_many(users, start_dt.isoformat(), end_dt.isoformat())
+
+        results = {}
+        for user in users:
+            outcome = synced[user]
+            try:
+                if isinstance(outcome, Exception):
+                    raise outcome
+
+                entry = self._synced_entry(outcome[0], outcome[1], start_dt, end_dt)
+                with self._lock:
+                    self.full_syncs += 1
+
+                events = self._select(entry, start, end, start_epoch, end_epoch)
+            except Exception as e:
+                print(f"Failed to retrieve calendar for {user}: {e}")
+                self.fetcher.invalidate(user)
+                self.invalidate(user)
+                results[user] = []
+                continue
+
+            self._put(user, entry)
+            results[user] = events
+            print(f"Retrieved {len(events)} events for {user}")
+
+        return results
+
+    def _refresh(self, user: str, start: str, end: str) -> List[Dict]:
+        start_epoch, end_epoch = to_epoch(start), to_epoch(end)
+
+        with self._lock:
+            entry = self._entries.get(user)
+
+        try:
+            with span('calendar_fetch', path='full_sync') as timer:
+                if self._can_sync_incrementally(entry, start_epoch, end_epoch):
+                    try:
+                        timer.path = 'incremental_sync'
+                        entry = self._incremental_sync(user, entry)
+                    except SyncTokenExpired:
+                        print(f"Sync token expired for {user}, running full sync")
+                        timer.path = 'full_sync'
+                        entry = self._full_sync(user, start, end)
+                else:
+                    entry = self._full_sync(user, start, end)
+
+            events = self._select(entry, start, end, start_epoch, end_epoch)
+        except Exception as e:
+            print(f"Failed to retrieve calendar for {user}: {e}")
+            self.fetcher.invalidate(user)
+            self.invalidate(user)
+            return []
+
+        self._put(user, entry)
+        print(f"Retrieved {len(events)} events for {user}")
+        return events
+
+    def _sync_window(self, start: str, end: str):
+        start_dt = datetime.fromisoformat(start.replace('Z', '+00:00'))
+        end_dt = max(
+            datetime.fromisoformat(end.replace('Z', '+00:00')),
+            start_dt + timedelta(days=self.window_days)
+        )
+        return start_dt, end_dt
+
+    def _full_sync(self, user: str, start: str, end: str) -> Dict:
+        start_dt, end_dt = self._sync_window(start, end)
+
+        items, sync_token = self.fetcher.sync_events(user, start_dt.isoformat(), end_dt.isoformat())
+
+        with self._lock:
+            self.full_syncs += 1
+
+        return self._synced_entry(items, sync_token, start_dt, end_dt)
+
+    def _synced_entry(self, items: List[Dict], sync_token: str, start_dt: datetime, end_dt: datetime) -> Dict:
+        return {
+            'items': {item['id']: item for item in items if item.get('status') != 'cancelled'},
+            'sync_token': sync_token,
+            'synced_at': time.time(),
+            'time_min': int(start_dt.timestamp()),
+            'time_max': int(end_dt.timestamp())
+        }
+
+    def _incremental_sync(self, user: str, entry: Dict) -> Dict:
+        changes, sync_token = self.fetcher.sync_events(user, sync_token=entry['sync_token'])
+
+        items = dict(entry['items'])
+        for item in changes:
+            if item.get('status') == 'cancelled':
+                items.pop(item['id'], None)
+            else:
+                items[item['id']] = item
+
+        with self._lock:
+            self.incremental_syncs += 1
+
+        return dict(entry, items=items, sync_token=sync_token, synced_at=time.time())
+
+    def _put(self, user: str, entry: Dict):
+        with self._lock:
+            self._entries[user] = entry
+            self._entries.move_to_end(user)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'users': len(self._entries),
+                'hits': self.hits,
+                'incremental_syncs': self.incremental_syncs,
+                'full_syncs': self.full_syncs,
+                'evictions': self.evictions
+            }
@@ -6,6 +6,17 @@ LLM_CONFIG = {
     'model_name': os.getenv('LLM_MODEL', '/home/user/Models/deepseek-ai/deepseek-llm-7b-chat'),
     'timeout': int(os.getenv('LLM_TIMEOUT', '30')),
     'max_retries': int(os.getenv('LLM_MAX_RETRIES', '3')),
+    'pool_size': int(os.getenv('LLM_POOL_SIZE', '10')),
+    'keepalive_timeout': int(os.getenv('LLM_KEEPALIVE_TIMEOUT', '30')),
+    'retry_backoff': float(os.getenv('LLM_RETRY_BACKOFF', '0.5')),
+    'batch_size': int(os.getenv('LLM_BATCH_SIZE', '16')),
+    'batch_max_wait_ms': float(os.getenv('LLM_BATCH_MAX_WAIT_MS', '5')),
+    'cache_max_bytes': int(os.getenv('LLM_CACHE_MAX_BYTES', str(32 * 1024 * 1024))),
+    'cache_ttl_seconds': float(os.getenv('LLM_CACHE_TTL_SECONDS', '3600')),
+    'cache_path': os.getenv('LLM_CACHE_PATH'),
+    'failure_threshold': int(os.getenv('LLM_FAILURE_THRESHOLD', '3')),
+    'reset_timeout': float(os.getenv('LLM_RESET_TIMEOUT', '30')),
+    'health_probe_interval': float(os.getenv('LLM_HEALTH_PROBE_INTERVAL', '15')),
     
     'openai_api_key': os.getenv('OPENAI_API_KEY'),
     'openai_model': os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo'),
@@ -22,6 +33,12 @@ CALENDAR_CONFIG = {
     'working_days': [0, 1, 2, 3, 4],
     'slot_duration_minutes': int(os.getenv('SLOT_DURATION_MINUTES', '15')),
     'buffer_minutes': int(os.getenv('DEFAULT_BUFFER_MINUTES', '15')),
+    'keys_dir': os.getenv('CALENDAR_KEYS_DIR', '../Keys/'),
+    'fetch_workers': int(os.getenv('CALENDAR_FETCH_WORKERS', '8')),
+    'fetch_mode': os.getenv('CALENDAR_FETCH_MODE', 'events'),
+    'store_ttl_seconds': float(os.getenv('CALENDAR_STORE_TTL_SECONDS', '60')),
+    'store_max_users': int(os.getenv('CALENDAR_STORE_MAX_USERS', '1000')),
+    'store_window_days': int(os.getenv('CALENDAR_STORE_WINDOW_DAYS', '14')),
 }
 
 AGENT_CONFIG = {
@@ -30,6 +47,13 @@ AGENT_CONFIG = {
     'preference_weight': float(os.getenv('PREFERENCE_WEIGHT', '0.7')),
     'timezone_fairness_weight': float(os.getenv('TIMEZONE_FAIRNESS_WEIGHT', '0.3')),
     'default_meeting_duration': int(os.getenv('DEFAULT_MEETING_DURATION', '30')),
+    'max_concurrent_evaluations': int(os.getenv('MAX_CONCURRENT_EVALUATIONS', '8')),
+    'search_horizon_days': int(os.getenv('SEARCH_HORIZON_DAYS', '1')),
+    'min_candidate_slots': int(os.getenv('MIN_CANDIDATE_SLOTS', '3')),
+    'regex_confidence_threshold': float(os.getenv('REGEX_CONFIDENCE_THRESHOLD', '0.7')),
+    'max_batch_size': int(os.getenv('MAX_BATCH_SIZE', '500')),
+    'batch_engine': os.getenv('BATCH_ENGINE', 'sequential'),
+    'solver_time_limit_ms': float(os.getenv('SOLVER_TIME_LIMIT_MS', '2000')),
 }
 
 API_CONFIG = {
@@ -39,6 +63,17 @@ API_CONFIG = {
     'cors_enabled': os.getenv('CORS_ENABLED', 'True').lower() == 'true',
 }
 
+METRICS_CONFIG = {
+    'attach_to_metadata': os.getenv('METRICS_IN_METADATA', 'False').lower() == 'true',
+}
+
+PROFILING_CONFIG = {
+    'sample_rate': float(os.getenv('PROFILE_SAMPLE_RATE', '0')),
+    'output_dir': os.getenv('PROFILE_DIR', 'profiles'),
+    'format': os.getenv('PROFILE_FORMAT', 'pstats'),
+    'sample_interval_ms': float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', '5')),
+}
+
 LOGGING_CONFIG = {
     'level': os.getenv('LOG_LEVEL', 'INFO'),
     'format': os.getenv('LOG_FORMAT', '%(asctime)s - %(name)s - %(levelname)s - %(message)s'),
@@ -146,6 +181,8 @@ def get_config() -> Dict[str, Any]:
         'calendar': CALENDAR_CONFIG,
         'agent': AGENT_CONFIG,
         'api': API_CONFIG,
+        'metrics': METRICS_CONFIG,
+        'profiling': PROFILING_CONFIG,
         'logging': LOGGING_CONFIG,
         'gpu': GPU_CONFIG,
         'validation': VALIDATION_RULES,
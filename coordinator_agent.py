@@ -2,76 +2,41 @@ import asyncio
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 import pytz
-import re
-from participant_agent import ParticipantAgent
+from email_features import extract_email_features
+from participant_agent import ParticipantAgent, ParticipantAgentPool
 from negotiator_agent import NegotiatorAgent
-from llm_service import LLMService
+from llm_service import get_llm_service
 from json_validator import JSONValidator
+from config import AGENT_CONFIG, METRICS_CONFIG
 from metadata_framework import record_coordinator, record_request, get_business_metadata, reset_business_metadata
+from metrics import begin_request, finish_request, timed
+from profiling import request_profiler
 
-import json
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from calendar_fetcher import CalendarFetcher
+from calendar_store import CalendarStore
+from batch_calendar import BatchCalendar
+from batch_solver import BatchSolver
+from schedule_types import Slot
+
+calendar_fetcher = CalendarFetcher()
+calendar_store = CalendarStore(calendar_fetcher)
 
 def retrieve_calendar_events(user, start, end):
-    events_list = []
-    try:
-        token_path = "../Keys/"+user.split("@")[0]+".token"
-        user_creds = Credentials.from_authorized_user_file(token_path)
-        calendar_service = build("calendar", "v3", credentials=user_creds)
-        events_result = calendar_service.events().list(
-            calendarId='primary', 
-            timeMin=start,
-            timeMax=end,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        events = events_result.get('items', [])
-        
-        start_dt = datetime.fromisoformat(start.replace('Z', '+00:00'))
-        end_dt = datetime.fromisoformat(end.replace('Z', '+00:00'))
-        target_date = start_dt.date()
-        
-        for event in events: 
-            attendee_list = []
-            try:
-                for attendee in event["attendees"]: 
-                    attendee_list.append(attendee['email'])
-            except: 
-                attendee_list.append("SELF")
-            
-            start_time = event["start"]["dateTime"]
-            end_time = event["end"]["dateTime"]
-            summary = event["summary"]
-            
-            event_start = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-            event_end = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-            
-            if not (event_end.date() < target_date or event_start.date() > target_date):
-                events_list.append({
-                    "StartTime": start_time, 
-                    "EndTime": end_time, 
-                    "NumAttendees": len(set(attendee_list)), 
-                    "Attendees": list(set(attendee_list)),
-                    "Summary": summary
-                })
-        
-        events_list.sort(key=lambda x: x["StartTime"])
-                
-    except Exception as e:
-        print(f"Failed to retrieve calendar for {user}: {e}")
-        events_list = []
-    
-    print(f"Retrieved {len(events_list)} events for {user}")
-    return events_list
+    return calendar_fetcher.fetch_events(user, start, end)
+
+def retrieve_calendar_events_many(users, start, end):
+    if calendar_fetcher.fetch_mode == 'freebusy':
+        return calendar_fetcher.fetch_many(users, start, end)
+    return calendar_store.get_many(users, start, end)
 
 class CoordinatorAgent:
     def __init__(self, llm_client=None):
-        self.llm = llm_client or LLMService()
+        self.llm = llm_client or get_llm_service()
         self.negotiator = NegotiatorAgent(self.llm)
         self.validator = JSONValidator()
         self.participants = {}
-        self.calendar_cache = {}
+        self.agent_pool = ParticipantAgentPool()
+        self.batch_solver = BatchSolver()
         self.user_preferences = {
             "userthree.amd@gmail.com": {
                 "preferred_times": ["morning"],
@@ -100,125 +65,43 @@ class CoordinatorAgent:
         }
         
     def _extract_duration_from_email(self, email_content: str) -> str:
-        patterns = [
-            r'(\d+)\s*minutes?',
-            r'(\d+)\s*mins?', 
-            r'(\d+)\s*hours?',
-            r'(\d+)\s*hrs?',
-            r'for\s+(\d+)\s*minutes?',
-            r'for\s+(\d+)\s*hours?'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, email_content.lower())
-            if match:
-                try:
-                    number = int(match.group(1))
-                    if 'hour' in pattern or 'hr' in pattern:
-                        number *= 60
-                    return str(number)
-                except (ValueError, IndexError):
-                    continue
-        
-        return "30"
+        duration_minutes = extract_email_features(email_content).duration_minutes
+        return str(duration_minutes) if duration_minutes is not None else "30"
     
     def _extract_target_date_from_email(self, email_content: str, email_datetime: str = None) -> str:
-        if email_datetime:
-            try:
-                if 'T' in email_datetime:
-                    date_part = email_datetime.split('T')[0]
-                    if '-' in date_part:
-                        parts = date_part.split('-')
-                        if len(parts[0]) == 4:
-                            reference_date = datetime.strptime(date_part, '%Y-%m-%d')
-                        else:
-                            reference_date = datetime.strptime(date_part, '%d-%m-%Y')
-                    else:
-                        reference_date = datetime.now()
-                else:
-                    reference_date = datetime.now()
-            except:
-                reference_date = datetime.now()
-        else:
-            reference_date = datetime.now()
-        
-        print(f"Reference date for parsing: {reference_date.strftime('%Y-%m-%d (%A)')}")
-        
-        content_lower = email_content.lower()
-        
-        if 'tomorrow' in content_lower:
-            target_date = reference_date + timedelta(days=1)
-            return target_date.strftime('%Y-%m-%d')
-        
-        if 'today' in content_lower:
-            return reference_date.strftime('%Y-%m-%d')
-        
-        if 'next week' in content_lower:
-            days_until_monday = (7 - reference_date.weekday()) % 7
-            if days_until_monday == 0:
-                days_until_monday = 7
-            target_date = reference_date + timedelta(days=days_until_monday)
-            return target_date.strftime('%Y-%m-%d')
-        
-        weekdays = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-        for i, day in enumerate(weekdays):
-            if f'next {day}' in content_lower:
-                current_weekday = reference_date.weekday()
-                target_weekday = i
-                
-                if target_weekday > current_weekday:
-                    days_ahead = target_weekday - current_weekday
-                else:
-                    days_ahead = 7 - current_weekday + target_weekday
-                
-                target_date = reference_date + timedelta(days=days_ahead)
-                
-                print(f"Calculated 'next {day}': {target_date.strftime('%Y-%m-%d (%A)')}")
-                return target_date.strftime('%Y-%m-%d')
-        
-        for i, day in enumerate(weekdays):
-            if day in content_lower and f'next {day}' not in content_lower:
-                current_weekday = reference_date.weekday()
-                target_weekday = i
-                
-                if target_weekday >= current_weekday:
-                    days_ahead = target_weekday - current_weekday
-                else:
-                    days_ahead = 7 - current_weekday + target_weekday
-                
-                target_date = reference_date + timedelta(days=days_ahead)
-                return target_date.strftime('%Y-%m-%d')
-        
-        tomorrow = reference_date + timedelta(days=1)
-        return tomorrow.strftime('%Y-%m-%d')
+        # The email parser's own date rule, so calendars are prefetched for the
+        # date the request will be scheduled on
+        return self.negotiator.email_parser.target_date(email_content, email_datetime)
     
-    def _get_calendar_events_cached(self, email: str, start_datetime: str, end_datetime: str) -> List[Dict]:
-        cache_key = f"{email}_{start_datetime}_{end_datetime}"
-        
-        if cache_key in self.calendar_cache:
-            print(f"Using cached calendar data for {email}")
-            return self.calendar_cache[cache_key]
-        
-        print(f"Fetching calendar data for {email}")
-        real_events = retrieve_calendar_events(email, start_datetime, end_datetime)
-        
-        self.calendar_cache[cache_key] = real_events
-        return real_events
+    def _get_calendar_events_cached(self, emails: List[str], start_datetime: str, end_datetime: str) -> Dict[str, List[Dict]]:
+        return retrieve_calendar_events_many(emails, start_datetime, end_datetime)
     
-    def _filter_relevant_events(self, events: List[Dict], target_date: str) -> List[Dict]:
+    def _filter_relevant_events(self, events: List[Dict], target_date: str, horizon_days: int = 1) -> List[Dict]:
         filtered_events = []
-        target_dt = datetime.strptime(target_date, '%Y-%m-%d').date()
+        first_date = datetime.strptime(target_date, '%Y-%m-%d').date()
+        last_date = first_date + timedelta(days=horizon_days - 1)
         
         for event in events:
             event_start = datetime.fromisoformat(event['StartTime'].replace('Z', '+00:00'))
             event_end = datetime.fromisoformat(event['EndTime'].replace('Z', '+00:00'))
             
-            if event_start.date() <= target_dt <= event_end.date():
+            if event_start.date() <= last_date and first_date <= event_end.date():
                 filtered_events.append(event)
         
         return filtered_events
     
-    def _transform_input_format(self, meeting_request: Dict) -> Dict:
+    def _window_covers_date(self, transformed_request: Dict, date_str: str) -> bool:
+        try:
+            requested_date = datetime.strptime(date_str, '%Y-%m-%d')
+        except (TypeError, ValueError):
+            return True
+        
+        first_date = datetime.strptime(transformed_request['Target_date'], '%Y-%m-%d')
+        return first_date <= requested_date < first_date + timedelta(days=transformed_request['Search_horizon_days'])
+    
+    @timed('input_transform')
+    def _transform_input_format(self, meeting_request: Dict, target_date: str = None,
+                                events_by_email: Dict[str, List[Dict]] = None) -> Dict:
         email_content = meeting_request.get('EmailContent', '')
         email_datetime = meeting_request.get('Datetime', '')
         duration_mins = self._extract_duration_from_email(email_content)
@@ -231,23 +114,28 @@ class CoordinatorAgent:
         
         attendee_emails = list(set(attendee_emails))
         
-        target_date = self._extract_target_date_from_email(email_content, email_datetime)
+        target_date = target_date or self._extract_target_date_from_email(email_content, email_datetime)
+        horizon_days = max(1, AGENT_CONFIG['search_horizon_days'])
+        last_date = (datetime.strptime(target_date, '%Y-%m-%d') + timedelta(days=horizon_days - 1)).strftime('%Y-%m-%d')
         start_datetime = f"{target_date}T00:00:00+05:30"
-        end_datetime = f"{target_date}T23:59:59+05:30"
+        end_datetime = f"{last_date}T23:59:59+05:30"
         
         print(f"Target date extracted: {target_date}")
         print(f"Looking up calendar events for date range: {start_datetime} to {end_datetime}")
         
         transformed_attendees = []
         
+        if events_by_email is None:
+            events_by_email = self._get_calendar_events_cached(attendee_emails, start_datetime, end_datetime)
+        
         for email in attendee_emails:
-            real_events = self._get_calendar_events_cached(email, start_datetime, end_datetime)
+            real_events = events_by_email.get(email)
             
             if not real_events:
                 print(f"No real calendar data for {email}, events will be empty")
                 real_events = []
             
-            filtered_events = self._filter_relevant_events(real_events, target_date)
+            filtered_events = self._filter_relevant_events(real_events, target_date, horizon_days)
             
             transformed_attendees.append({
                 'email': email,
@@ -257,11 +145,17 @@ class CoordinatorAgent:
         transformed_request = meeting_request.copy()
         transformed_request['Duration_mins'] = duration_mins
         transformed_request['Attendees'] = transformed_attendees
+        transformed_request['Search_horizon_days'] = horizon_days
+        transformed_request['Target_date'] = target_date
         
         return transformed_request
     
-    def create_participant_agents(self, attendees_data: List[Dict]) -> List[ParticipantAgent]:
+    def create_participant_agents(self, attendees_data: List[Dict],
+                                  batch_calendar: BatchCalendar = None) -> List[ParticipantAgent]:
         agents = []
+        event_resolver = None
+        if calendar_fetcher.fetch_mode == 'freebusy':
+            event_resolver = calendar_fetcher.fetch_event_detail
         
         for attendee in attendees_data:
             email = attendee['email']
@@ -275,11 +169,13 @@ class CoordinatorAgent:
                 'seniority_weight': 0.5
             })
             
-            agent = ParticipantAgent(
+            agent = self.agent_pool.acquire(
                 email=email,
                 calendar_data=calendar_events,
                 preferences=preferences,
-                llm_client=self.llm
+                llm_client=self.llm,
+                event_resolver=event_resolver,
+                busy_index=batch_calendar.index_for(email) if batch_calendar is not None else None
             )
             
             agents.append(agent)
@@ -287,16 +183,242 @@ class CoordinatorAgent:
         
         return agents
     
-    async def schedule_meeting(self, meeting_request: Dict) -> Dict:
+    async def schedule_meeting(self, meeting_request: Dict, profile: bool = False) -> Dict:
+        if request_profiler.should_profile(profile):
+            async with request_profiler.profile(meeting_request.get('Request_id', 'unknown')):
+                return await self._schedule_meeting(meeting_request)
+        return await self._schedule_meeting(meeting_request)
+    
+    async def schedule_batch(self, meeting_requests: List[Dict], engine: str = None) -> List[Dict]:
+        """Schedule meeting_requests against calendars shared by the batch.
+        
+        Emails are parsed concurrently and each distinct attendee's calendar is
+        fetched once for the whole batch window. With the 'sequential' engine
+        requests are negotiated one after another over the shared busy indexes,
+        and every placed meeting is committed so later requests see it; the
+        'solver' engine places all of them jointly with BatchSolver instead.
+        """
+        engine = engine or AGENT_CONFIG['batch_engine']
+        print(f"Processing batch of {len(meeting_requests)} requests")
+        
+        parsed_emails = await asyncio.gather(
+            *(self.negotiator.email_parser.parse_email_async(request.get('EmailContent', ''), request.get('Datetime'))
+              for request in meeting_requests),
+            return_exceptions=True
+        )
+        
+        horizon_days = max(1, AGENT_CONFIG['search_horizon_days'])
+        target_dates = []
+        attendee_emails = set()
+        for meeting_request, parsed_email in zip(meeting_requests, parsed_emails):
+            parsed_date = parsed_email.get('suggested_date') if isinstance(parsed_email, dict) else None
+            target_dates.append(self._batch_target_date(meeting_request, parsed_date))
+            attendee_emails.update(att.get('email') for att in meeting_request.get('Attendees', []) if att.get('email'))
+            if meeting_request.get('From'):
+                attendee_emails.add(meeting_request['From'])
+        
+        batch_calendar = BatchCalendar({})
+        valid_dates = [target_date for target_date in target_dates if target_date]
+        if valid_dates and attendee_emails:
+            last_date = (datetime.strptime(max(valid_dates), '%Y-%m-%d') + timedelta(days=horizon_days - 1)).strftime('%Y-%m-%d')
+            start_datetime = f"{min(valid_dates)}T00:00:00+05:30"
+            end_datetime = f"{last_date}T23:59:59+05:30"
+            print(f"Fetching {len(attendee_emails)} calendars once for {start_datetime} to {end_datetime}")
+            batch_calendar = BatchCalendar(await asyncio.to_thread(
+                self._get_calendar_events_cached, sorted(attendee_emails), start_datetime, end_datetime
+            ))
+        
+        if engine == 'solver':
+            return await self._solve_batch(meeting_requests, parsed_emails, target_dates, batch_calendar)
+        
+        responses = []
+        for meeting_request, parsed_email, target_date in zip(meeting_requests, parsed_emails, target_dates):
+            if isinstance(parsed_email, Exception):
+                parsed_email = None
+            
+            async def prepare(request, parsed_email=parsed_email, target_date=target_date):
+                transformed_request = await asyncio.to_thread(
+                    self._transform_input_format, request, target_date, batch_calendar.events
+                )
+                if parsed_email is None:
+                    parsed_email = await self.negotiator.email_parser.parse_email_async(
+                        request.get('EmailContent', ''), request.get('Datetime')
+                    )
+                return transformed_request, parsed_email
+            
+            response = await self._schedule_meeting(meeting_request, prepare, batch_calendar)
+            batch_calendar.commit_response(response)
+            responses.append(response)
+        
+        print(f"Batch complete: {batch_calendar.committed}/{len(meeting_requests)} meetings placed")
+        return responses
+    
+    async def _solve_batch(self, meeting_requests: List[Dict], parsed_emails: List, target_dates: List[str],
+                           batch_calendar: BatchCalendar) -> List[Dict]:
+        problems = []
+        transformed_requests = []
+        for meeting_request, parsed_email, target_date in zip(meeting_requests, parsed_emails, target_dates):
+            try:
+                transformed_request = await asyncio.to_thread(
+                    self._transform_input_format, meeting_request, target_date, batch_calendar.events
+                )
+                participants = self.create_participant_agents(transformed_request['Attendees'], batch_calendar)
+                try:
+                    slots = self._batch_candidate_slots(participants, transformed_request)
+                finally:
+                    self.agent_pool.release(participants)
+                
+                problems.append({
+                    'attendees': [attendee['email'] for attendee in transformed_request['Attendees']],
+                    'slots': slots
+                })
+                transformed_requests.append(transformed_request)
+            except Exception as e:
+                print(f"Could not build candidates for {meeting_request.get('Request_id', 'unknown')}: {e}")
+                problems.append({'attendees': [], 'slots': []})
+                transformed_requests.append(e)
+        
+        result = await asyncio.to_thread(self.batch_solver.solve, problems)
+        print(f"Batch solver {result['status']}: placed {result['placed']}/{len(problems)}, "
+              f"objective {result['objective']} (warm start {result['warm_start_objective']}), "
+              f"{result['nodes']} nodes in {result['solve_time_ms']:.1f}ms")
+        
+        solver_summary = {key: result[key] for key in
+                          ('status', 'objective', 'warm_start_objective', 'placed', 'nodes', 'solve_time_ms')}
+        
+        responses = []
+        for meeting_request, transformed_request, slot in zip(meeting_requests, transformed_requests,
+                                                              result['assignments']):
+            response = self._format_solved_response(meeting_request, transformed_request, slot, batch_calendar)
+            response['MetaData']['batch_solver'] = solver_summary
+            batch_calendar.commit_response(response)
+            responses.append(response)
+        
+        print(f"Batch complete: {batch_calendar.committed}/{len(meeting_requests)} meetings placed")
+        return responses
+    
+    def _batch_candidate_slots(self, participants: List[ParticipantAgent], transformed_request: Dict) -> List[Slot]:
+        """Slots free for every participant over the search horizon, scored like the negotiator does."""
+        urgency = self.negotiator.extract_urgency_from_email(transformed_request.get('EmailContent', ''))
+        duration_mins = int(transformed_request['Duration_mins'])
+        min_threshold = 0.1 if urgency == 'urgent' else 0.2
+        search_dates = self.negotiator.search_dates(
+            transformed_request['Target_date'], transformed_request['Search_horizon_days']
+        )
+        # Attendee order comes from a set, so the slot timezone is the requester's
+        # rather than whoever happens to be first
+        slot_tz = self.negotiator.requester_timezone(participants, transformed_request)
+        
+        candidates = []
+        for day_offset, search_date in enumerate(search_dates):
+            slot_maps = []
+            for participant in participants:
+                slot_map = {}
+                for slot in participant.candidate_slots(search_date, duration_mins, urgency):
+                    slot_map.setdefault(slot.key, slot)
+                slot_maps.append(slot_map)
+            if not slot_maps:
+                break
+            
+            for slot_key in sorted(set(slot_maps[0]).intersection(*slot_maps[1:])):
+                average_preference = sum(slot_map[slot_key].preference_score for slot_map in slot_maps) / len(slot_maps)
+                if average_preference < min_threshold:
+                    continue
+                
+                slot = Slot(slot_key[0], slot_key[1], slot_tz)
+                slot.average_preference = average_preference
+                slot.urgency_bonus = self.negotiator.calculate_urgency_bonus(slot, urgency)
+                slot.overall_score = average_preference + slot.urgency_bonus
+                slot.day_offset = day_offset
+                candidates.append(slot)
+        
+        return candidates
+    
+    def _format_solved_response(self, meeting_request: Dict, transformed_request, slot: Slot,
+                                batch_calendar: BatchCalendar) -> Dict:
+        request_metrics = begin_request()
+        reset_business_metadata()
+        record_request(meeting_request)
+        
+        if isinstance(transformed_request, Exception):
+            response = self._format_error_response_correct_format(str(transformed_request), meeting_request)
+            self._finish_request_metrics(request_metrics, 'error', response)
+            return response
+        
+        # Attendee events are re-read so meetings placed earlier in the batch show up
+        transformed_request = self._transform_input_format(
+            meeting_request, transformed_request['Target_date'], batch_calendar.events
+        )
+        
+        if slot is not None:
+            record_coordinator(
+                action="place meeting with batch solver",
+                outcome=f"confirmed meeting for {slot.start_iso()}",
+                reasoning="Placed jointly with the other requests in the batch to schedule as many meetings as possible at preferred times"
+            )
+            response = self._format_success_response_correct_format(
+                {'scheduled_slot': slot}, meeting_request, transformed_request
+            )
+            self._finish_request_metrics(request_metrics, 'success', response)
+        else:
+            record_coordinator(
+                action="handle scheduling failure",
+                outcome="no suitable time found",
+                reasoning="No slot was free for every attendee once the other meetings in the batch were placed"
+            )
+            response = self._format_failure_response_correct_format({}, meeting_request, transformed_request)
+            self._finish_request_metrics(request_metrics, 'no_slot', response)
+        
+        return response
+    
+    def _batch_target_date(self, meeting_request: Dict, parsed_date: str = None) -> str:
+        try:
+            if parsed_date:
+                datetime.strptime(parsed_date, '%Y-%m-%d')
+                return parsed_date
+        except (TypeError, ValueError):
+            pass
+        
+        try:
+            return self._extract_target_date_from_email(
+                meeting_request.get('EmailContent', ''), meeting_request.get('Datetime', '')
+            )
+        except Exception as e:
+            print(f"Could not determine target date for {meeting_request.get('Request_id', 'unknown')}: {e}")
+            return None
+    
+    async def _prepare_request(self, meeting_request: Dict):
+        # The email parse and the calendar fetch for the regex-derived date are
+        # independent, so run them together; calendars are only fetched again
+        # when the parsed date falls outside the prefetched window
+        transformed_request, parsed_email = await asyncio.gather(
+            asyncio.to_thread(self._transform_input_format, meeting_request),
+            self.negotiator.email_parser.parse_email_async(
+                meeting_request.get('EmailContent', ''), meeting_request.get('Datetime')
+            )
+        )
+        
+        parsed_date = parsed_email.get('suggested_date')
+        if parsed_date and not self._window_covers_date(transformed_request, parsed_date):
+            print(f"Parsed date {parsed_date} is outside prefetched window from "
+                  f"{transformed_request['Target_date']}, fetching calendars again")
+            transformed_request = await asyncio.to_thread(
+                self._transform_input_format, meeting_request, parsed_date
+            )
+        
+        return transformed_request, parsed_email
+    
+    async def _schedule_meeting(self, meeting_request: Dict, prepare=None,
+                                batch_calendar: BatchCalendar = None) -> Dict:
+        participants = []
+        request_metrics = begin_request()
         try:
-            self.calendar_cache.clear()
             reset_business_metadata()
             
             record_request(meeting_request)
             
             request_id = meeting_request.get('Request_id', 'unknown')
             attendees = meeting_request.get('Attendees', [])
-            email_content = meeting_request.get('EmailContent', '')
             
             print(f"Processing request: {request_id}")
             
@@ -306,7 +428,7 @@ class CoordinatorAgent:
                 reasoning="Analyzed email content to understand meeting constraints and participant needs"
             )
             
-            transformed_request = self._transform_input_format(meeting_request)
+            transformed_request, parsed_email = await (prepare or self._prepare_request)(meeting_request)
             duration_extracted = transformed_request['Duration_mins']
             
             print(f"Duration extracted: {duration_extracted} minutes")
@@ -317,7 +439,7 @@ class CoordinatorAgent:
                 reasoning="Each participant needs personalized scheduling logic based on their preferences and calendar"
             )
             
-            participants = self.create_participant_agents(transformed_request['Attendees'])
+            participants = self.create_participant_agents(transformed_request['Attendees'], batch_calendar)
             print(f"Created {len(participants)} participant agents")
             
             record_coordinator(
@@ -326,10 +448,12 @@ class CoordinatorAgent:
                 reasoning="Negotiator will find optimal time by balancing all participant constraints and preferences"
             )
             
-            negotiation_result = await self.negotiator.negotiate_meeting(participants, transformed_request)
+            negotiation_result = await self.negotiator.negotiate_meeting(
+                participants, transformed_request, parsed_email
+            )
             
             if negotiation_result['success']:
-                scheduled_time = negotiation_result['scheduled_slot']['start_time']
+                scheduled_time = negotiation_result['scheduled_slot'].start_iso()
                 
                 record_coordinator(
                     action="finalize successful scheduling",
@@ -340,6 +464,7 @@ class CoordinatorAgent:
                 response = self._format_success_response_correct_format(
                     negotiation_result, meeting_request, transformed_request
                 )
+                self._finish_request_metrics(request_metrics, 'success', response)
                 return response
                 
             else:
@@ -354,6 +479,7 @@ class CoordinatorAgent:
                 response = self._format_failure_response_correct_format(
                     negotiation_result, meeting_request, transformed_request
                 )
+                self._finish_request_metrics(request_metrics, 'no_slot', response)
                 return response
                 
         except Exception as e:
@@ -366,14 +492,26 @@ class CoordinatorAgent:
             print(f"Error in schedule_meeting: {e}")
             import traceback
             traceback.print_exc()
-            return self._format_error_response_correct_format(str(e), meeting_request)
+            response = self._format_error_response_correct_format(str(e), meeting_request)
+            self._finish_request_metrics(request_metrics, 'error', response)
+            return response
+        finally:
+            self.agent_pool.release(participants)
+    
+    def _finish_request_metrics(self, request_metrics, outcome: str, response: Dict):
+        finish_request(request_metrics, outcome)
+        if METRICS_CONFIG['attach_to_metadata']:
+            response['MetaData']['metrics'] = request_metrics.to_dict()
     
+    @timed('response_formatting')
     def _format_success_response_correct_format(self, result: Dict, original_request: Dict, transformed_request: Dict) -> Dict:
         scheduled_slot = result['scheduled_slot']
+        event_start = scheduled_slot.start_iso()
+        event_end = scheduled_slot.end_iso()
         
         new_event = {
-            "StartTime": scheduled_slot['start_time'],
-            "EndTime": scheduled_slot['end_time'],
+            "StartTime": event_start,
+            "EndTime": event_end,
             "NumAttendees": len(transformed_request['Attendees']),
             "Attendees": [att['email'] for att in transformed_request['Attendees']],
             "Summary": original_request.get('Subject', 'Meeting')
@@ -399,8 +537,8 @@ class CoordinatorAgent:
             'Attendees': output_attendees,
             'Subject': original_request['Subject'],
             'EmailContent': original_request['EmailContent'],
-            'EventStart': scheduled_slot['start_time'],
-            'EventEnd': scheduled_slot['end_time'],
+            'EventStart': event_start,
+            'EventEnd': event_end,
             'Duration_mins': transformed_request['Duration_mins'],
             'MetaData': {
                 'agent_reasoning_summary': business_summary_lines
@@ -409,6 +547,7 @@ class CoordinatorAgent:
         
         return response
     
+    @timed('response_formatting')
     def _format_failure_response_correct_format(self, result: Dict, original_request: Dict, transformed_request: Dict) -> Dict:
         output_attendees = []
         for attendee_data in transformed_request['Attendees']:
@@ -436,6 +575,7 @@ class CoordinatorAgent:
             'error': 'No available time slot found'
         }
     
+    @timed('response_formatting')
     def _format_error_response_correct_format(self, error: str, original_request: Dict) -> Dict:
         business_summary_lines = get_business_metadata().generate_business_summary()
         
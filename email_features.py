@@ -0,0 +1,117 @@
+import re
+from functools import lru_cache
+from typing import FrozenSet, NamedTuple, Optional
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+# Every keyword any consumer looks for: urgency levels, meeting types and the
+# "low urgency" phrases. Matching is substring-style, as in the old checks.
+KEYWORDS = [
+    'urgent', 'asap', 'immediately', 'emergency', 'critical', 'rush',
+    'important', 'priority', 'soon', 'deadline', 'time-sensitive',
+    'when convenient', 'sometime', 'no rush', 'flexible',
+    'standup', 'daily', 'scrum', 'review', 'retrospective', 'demo',
+    'planning', 'brainstorm', 'strategy',
+]
+
+# A keyword found inside a longer one ("rush" in "no rush") still counts
+_CONTAINED_KEYWORDS = {
+    keyword: frozenset(other for other in KEYWORDS if other in keyword) for keyword in KEYWORDS
+}
+
+_WEEKDAY_ALTERNATION = '|'.join(WEEKDAYS)
+
+_FEATURE_PATTERN = re.compile(
+    r'(?P<clock_hour>\d{1,2}):(?P<clock_minute>\d{2})\s*(?P<clock_period>am|pm)'
+    r'|(?P<hour>\d{1,2})\s*(?P<period>am|pm)'
+    r'|(?P<amount>\d+)(?:\s*(?P<unit>minutes?|mins?|hours?|hrs?)|-(?P<hyphen_unit>minute|hour))'
+    r'|next\s+(?P<next_weekday>' + _WEEKDAY_ALTERNATION + r')'
+    r'|(?P<relative>tomorrow|today|next\s+week)'
+    r'|\b(?P<weekday>' + _WEEKDAY_ALTERNATION + r')\b'
+    r'|(?P<keyword>' + '|'.join(re.escape(keyword) for keyword in sorted(KEYWORDS, key=len, reverse=True)) + r')'
+    r'|(?P<next>next)'
+)
+
+
+class EmailFeatures(NamedTuple):
+    """Everything the scheduler reads from an email body, from one regex scan."""
+    duration_minutes: Optional[int]
+    suggested_time: Optional[str]
+    relative_dates: FrozenSet[str]
+    next_weekdays: FrozenSet[int]
+    weekdays: FrozenSet[int]
+    mentions_next: bool
+    keywords: FrozenSet[str]
+
+    def has_any(self, keywords) -> bool:
+        return any(keyword in self.keywords for keyword in keywords)
+
+
+def _to_clock(hour: int, minute: int, period: str) -> Optional[str]:
+    if period == 'pm' and hour != 12:
+        hour += 12
+    elif period == 'am' and hour == 12:
+        hour = 0
+    return f"{hour:02d}:{minute:02d}"
+
+
+@lru_cache(maxsize=256)
+def extract_email_features(email_content: str) -> EmailFeatures:
+    """Scan email_content once and return its scheduling features.
+
+    Times prefer an H:MM am/pm mention over a bare "H am/pm"; durations prefer
+    the first minute-based mention over an hour-based one, and are None when
+    the email gives none so each caller can apply its own default. Results are
+    cached per email text, so every agent handling a request shares one scan.
+    """
+    clock_time = None
+    hour_time = None
+    minute_duration = None
+    hour_duration = None
+    relative_dates = set()
+    next_weekdays = set()
+    weekdays = set()
+    keywords = set()
+    mentions_next = False
+
+    for match in _FEATURE_PATTERN.finditer(email_content.lower()):
+        kind = match.lastgroup
+
+        if match.group('clock_hour') is not None:
+            if clock_time is None:
+                clock_time = _to_clock(int(match.group('clock_hour')), int(match.group('clock_minute')),
+                                       match.group('clock_period'))
+        elif kind == 'period':
+            if hour_time is None:
+                hour_time = _to_clock(int(match.group('hour')), 0, match.group('period'))
+        elif match.group('amount') is not None:
+            unit = match.group('unit') or match.group('hyphen_unit')
+            amount = int(match.group('amount'))
+            if unit.startswith('h'):
+                if hour_duration is None:
+                    hour_duration = amount * 60
+            elif minute_duration is None:
+                minute_duration = amount
+        elif kind == 'next_weekday':
+            next_weekdays.add(WEEKDAYS.index(match.group('next_weekday')))
+            mentions_next = True
+        elif kind == 'relative':
+            relative = ' '.join(match.group('relative').split())
+            relative_dates.add(relative)
+            mentions_next = mentions_next or relative == 'next week'
+        elif kind == 'weekday':
+            weekdays.add(WEEKDAYS.index(match.group('weekday')))
+        elif kind == 'keyword':
+            keywords.update(_CONTAINED_KEYWORDS[match.group('keyword')])
+        elif kind == 'next':
+            mentions_next = True
+
+    return EmailFeatures(
+        duration_minutes=minute_duration if minute_duration is not None else hour_duration,
+        suggested_time=clock_time or hour_time,
+        relative_dates=frozenset(relative_dates),
+        next_weekdays=frozenset(next_weekdays),
+        weekdays=frozenset(weekdays),
+        mentions_next=mentions_next,
+        keywords=frozenset(keywords)
+    )
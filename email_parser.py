@@ -1,45 +1,140 @@
-import re
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 import pytz
 import json
+import threading
+from email_features import WEEKDAYS, extract_email_features
+from config import AGENT_CONFIG
+from metrics import span
 
 class EmailParser:
-    def __init__(self, llm_service=None):
+    def __init__(self, llm_service=None, confidence_threshold: float = None):
         self.llm_service = llm_service
-        
-        self.time_patterns = [
-            r'(\d{1,2}):(\d{2})\s*(AM|PM|am|pm)',
-            r'(\d{1,2})\s*(AM|PM|am|pm)',
-            r'at\s+(\d{1,2}):(\d{2})\s*(AM|PM|am|pm)',
-            r'at\s+(\d{1,2})\s*(AM|PM|am|pm)',
-        ]
-        
-        self.duration_patterns = [
-            r'(\d+)\s*(minutes?|mins?)',
-            r'(\d+)\s*(hours?|hrs?)',
-            r'for\s+(\d+)\s*(minutes?|mins?)',
-            r'for\s+(\d+)\s*(hours?|hrs?)',
-            r'(\d+)-minute',
-            r'(\d+)-hour'
-        ]
+        self.confidence_threshold = (
+            confidence_threshold if confidence_threshold is not None
+            else AGENT_CONFIG['regex_confidence_threshold']
+        )
+        self.path_counts = {'regex_fast_path': 0, 'llm': 0, 'regex_fallback': 0}
+        self._counts_lock = threading.Lock()
 
     def parse_email(self, email_content: str, request_datetime: str = None) -> Dict:
+        with span('email_parse') as timer:
+            result, timer.path = self._parse_email(email_content, request_datetime)
+        self._count_path(timer.path)
+        return result
+    
+    async def parse_email_async(self, email_content: str, request_datetime: str = None) -> Dict:
+        with span('email_parse') as timer:
+            result, timer.path = await self._parse_email_async(email_content, request_datetime)
+        self._count_path(timer.path)
+        return result
+    
+    def _parse_email(self, email_content: str, request_datetime: str = None) -> Tuple[Dict, str]:
+        if self._is_confident(email_content, request_datetime):
+            return self._parse_with_regex(email_content, request_datetime), 'regex_fast_path'
+        
         if self.llm_service:
             try:
                 llm_result = self._parse_with_llm(email_content, request_datetime)
                 if llm_result:
-                    return llm_result
+                    return llm_result, 'llm'
             except Exception as e:
                 print(f"LLM parsing failed: {e}")
         
-        return self._parse_with_regex(email_content, request_datetime)
+        return self._parse_with_regex(email_content, request_datetime), 'regex_fallback'
+    
+    async def _parse_email_async(self, email_content: str, request_datetime: str = None) -> Tuple[Dict, str]:
+        # Same as _parse_email, but the LLM prompt goes through generate_async so
+        # it can share a batched completions call with other in-flight prompts
+        if self._is_confident(email_content, request_datetime):
+            return self._parse_with_regex(email_content, request_datetime), 'regex_fast_path'
+        
+        if self.llm_service:
+            try:
+                prompt = self._build_llm_prompt(email_content, request_datetime)
+                print("Calling LLM for email parsing")
+                response = await self.llm_service.generate_async(prompt, max_tokens=120)
+                llm_result = self._parse_llm_response(response)
+                if llm_result:
+                    return llm_result, 'llm'
+            except Exception as e:
+                print(f"LLM parsing failed: {e}")
+        
+        return self._parse_with_regex(email_content, request_datetime), 'regex_fallback'
+    
+    def _is_confident(self, email_content: str, request_datetime: str = None) -> bool:
+        if not self.llm_service:
+            return False
+        
+        if request_datetime and self._parse_base_date(request_datetime) is None:
+            # Relative dates would be anchored on today instead of the request date
+            print(f"Unrecognised request datetime {request_datetime}, using LLM")
+            return False
+        
+        confidence = self.regex_confidence(email_content)
+        if confidence < self.confidence_threshold:
+            print(f"Regex confidence {confidence:.2f} below {self.confidence_threshold:.2f}, using LLM")
+            return False
+        
+        print(f"Regex confidence {confidence:.2f}, skipping LLM")
+        return True
+    
+    def regex_confidence(self, email_content: str) -> float:
+        """How far the rule-based parse can be trusted, from 0 to 1.
+        
+        A single unambiguous date reference and an explicit duration carry most
+        of the weight; an explicit time adds a little. Competing date references
+        or a "next" that isn't "next week"/"next <day>" lower the score.
+        """
+        features = extract_email_features(email_content)
+        date_mentions = len(features.relative_dates) + len(features.weekdays | features.next_weekdays)
+        
+        confidence = 0.0
+        if date_mentions == 1:
+            confidence += 0.4
+        elif date_mentions > 1:
+            confidence += 0.1
+        
+        if features.duration_minutes is not None:
+            confidence += 0.3
+        if features.suggested_time is not None:
+            confidence += 0.2
+        
+        if features.mentions_next and not features.next_weekdays and 'next week' not in features.relative_dates:
+            confidence -= 0.3
+        
+        return round(max(0.0, min(1.0, confidence)), 2)
+    
+    def _count_path(self, path: str):
+        with self._counts_lock:
+            self.path_counts[path] += 1
+    
+    def path_stats(self) -> Dict:
+        with self._counts_lock:
+            counts = dict(self.path_counts)
+        total = sum(counts.values())
+        return {
+            'total': total,
+            'counts': counts,
+            'shares': {path: (count / total if total else 0.0) for path, count in counts.items()}
+        }
     
     def _parse_with_llm(self, email_content: str, request_datetime: str = None) -> Optional[Dict]:
         try:
-            base_date = self._get_base_date(request_datetime)
+            prompt = self._build_llm_prompt(email_content, request_datetime)
             
-            prompt = f"""Extract meeting details from this email sent on {base_date.strftime('%Y-%m-%d')}:
+            print("Calling LLM for email parsing")
+            response = self.llm_service.generate(prompt, max_tokens=120)
+            return self._parse_llm_response(response)
+                
+        except Exception as e:
+            print(f"LLM parsing failed: {e}")
+            return None
+    
+    def _build_llm_prompt(self, email_content: str, request_datetime: str = None) -> str:
+        base_date = self._get_base_date(request_datetime)
+        
+        return f"""Extract meeting details from this email sent on {base_date.strftime('%Y-%m-%d')}:
 "{email_content}"
 
 Calculate the actual meeting date based on relative references.
@@ -59,40 +154,34 @@ Examples:
 - If email says "30 minutes", return duration_minutes: 30
 
 Only return valid JSON, no other text."""
-            
-            print("Calling LLM for email parsing")
-            response = self.llm_service.generate(prompt, max_tokens=120)
-            print(f"LLM Response: {response}")
-            
-            response_clean = response.strip()
-            
-            if response_clean.startswith('```json'):
-                response_clean = response_clean.replace('```json', '').replace('```', '')
-            if response_clean.startswith('```'):
-                response_clean = response_clean.replace('```', '')
-            
-            start_idx = response_clean.find('{')
-            end_idx = response_clean.rfind('}') + 1
-            
-            if start_idx >= 0 and end_idx > start_idx:
-                json_str = response_clean[start_idx:end_idx]
+    
+    def _parse_llm_response(self, response: str) -> Optional[Dict]:
+        print(f"LLM Response: {response}")
+        
+        response_clean = response.strip()
+        
+        if response_clean.startswith('```json'):
+            response_clean = response_clean.replace('```json', '').replace('```', '')
+        if response_clean.startswith('```'):
+            response_clean = response_clean.replace('```', '')
+        
+        start_idx = response_clean.find('{')
+        end_idx = response_clean.rfind('}') + 1
+        
+        if start_idx >= 0 and end_idx > start_idx:
+            json_str = response_clean[start_idx:end_idx]
+            try:
                 parsed_result = json.loads(json_str)
-                print(f"LLM parsing successful: {parsed_result}")
-                return parsed_result
-            else:
-                print(f"No JSON found in LLM response: {response}")
+            except json.JSONDecodeError as e:
+                print(f"JSON parsing failed: {e}")
                 return None
-                
-        except json.JSONDecodeError as e:
-            print(f"JSON parsing failed: {e}")
-            return None
-        except Exception as e:
-            print(f"LLM parsing failed: {e}")
+            print(f"LLM parsing successful: {parsed_result}")
+            return parsed_result
+        else:
+            print(f"No JSON found in LLM response: {response}")
             return None
     
     def _parse_with_regex(self, email_content: str, request_datetime: str = None) -> Dict:
-        content_lower = email_content.lower()
-        
         base_date = self._get_base_date(request_datetime)
         print(f"Base date for calculation: {base_date.strftime('%Y-%m-%d (%A)')}")
         
@@ -113,38 +202,50 @@ Only return valid JSON, no other text."""
         print(f"Regex parsing result: {result}")
         return result
     
+    def target_date(self, email_content: str, request_datetime: str = None) -> str:
+        """The meeting date the rule-based parse finds in email_content, as YYYY-MM-DD."""
+        return self._extract_date_with_calculation(email_content, self._get_base_date(request_datetime))
+    
     def _get_base_date(self, request_datetime: str = None) -> datetime:
+        base_date = self._parse_base_date(request_datetime)
+        if base_date is None:
+            if request_datetime:
+                print(f"Error parsing request datetime {request_datetime}, using today")
+            base_date = datetime.now()
+        return base_date
+    
+    def _parse_base_date(self, request_datetime: str = None) -> Optional[datetime]:
         if request_datetime:
-            try:
-                if 'T' in request_datetime:
-                    date_part = request_datetime.split('T')[0]
-                    return datetime.strptime(date_part, '%d-%m-%Y')
-                else:
-                    for fmt in ['%Y-%m-%d', '%d-%m-%Y', '%m-%d-%Y']:
-                        try:
-                            return datetime.strptime(request_datetime, fmt)
-                        except ValueError:
-                            continue
-            except Exception as e:
-                print(f"Error parsing request datetime {request_datetime}: {e}")
+            if 'T' in request_datetime:
+                date_part = request_datetime.split('T')[0]
+                formats = ['%Y-%m-%d', '%d-%m-%Y']
+            else:
+                date_part = request_datetime
+                formats = ['%Y-%m-%d', '%d-%m-%Y', '%m-%d-%Y']
+            
+            for fmt in formats:
+                try:
+                    return datetime.strptime(date_part, fmt)
+                except ValueError:
+                    continue
         
-        return datetime.now()
+        return None
     
     def _extract_date_with_calculation(self, content: str, base_date: datetime) -> str:
-        content_lower = content.lower()
+        features = extract_email_features(content)
         
         print(f"Analyzing email content from base date {base_date.strftime('%Y-%m-%d (%A)')}")
         
-        if 'tomorrow' in content_lower:
+        if 'tomorrow' in features.relative_dates:
             target_date = base_date + timedelta(days=1)
             print(f"Found 'tomorrow' -> {target_date.strftime('%Y-%m-%d (%A)')}")
             return target_date.strftime('%Y-%m-%d')
         
-        if 'today' in content_lower:
+        if 'today' in features.relative_dates:
             print(f"Found 'today' -> {base_date.strftime('%Y-%m-%d (%A)')}")
             return base_date.strftime('%Y-%m-%d')
         
-        if 'next week' in content_lower:
+        if 'next week' in features.relative_dates:
             days_until_next_monday = 7 - base_date.weekday()
             if days_until_next_monday == 7:
                 days_until_next_monday = 7
@@ -152,19 +253,13 @@ Only return valid JSON, no other text."""
             print(f"Found 'next week' -> {target_date.strftime('%Y-%m-%d (%A)')}")
             return target_date.strftime('%Y-%m-%d')
         
-        weekdays = {
-            'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3, 
-            'friday': 4, 'saturday': 5, 'sunday': 6
-        }
-        
-        for day_name, day_num in weekdays.items():
-            next_day_pattern = f'next\\s+{day_name}'
-            if re.search(next_day_pattern, content_lower):
+        for day_num, day_name in enumerate(WEEKDAYS):
+            if day_num in features.next_weekdays:
                 target_date = self._get_next_weekday(base_date, day_num)
                 print(f"Found 'next {day_name}' -> {target_date.strftime('%Y-%m-%d (%A)')}")
                 return target_date.strftime('%Y-%m-%d')
             
-            elif re.search(f'\\b{day_name}\\b', content_lower) and 'next' not in content_lower:
+            elif day_num in features.weekdays and not features.mentions_next:
                 current_weekday = base_date.weekday()
                 if day_num > current_weekday:
                     days_ahead = day_num - current_weekday
@@ -185,90 +280,44 @@ Only return valid JSON, no other text."""
         return target_date.strftime('%Y-%m-%d')
     
     def _get_next_weekday(self, base_date: datetime, target_weekday: int) -> datetime:
+        # "next Thursday" is the first Thursday after base_date, as in the LLM prompt
         current_weekday = base_date.weekday()
         
-        if target_weekday >= current_weekday:
-            days_ahead = 7 + (target_weekday - current_weekday)
+        if target_weekday > current_weekday:
+            days_ahead = target_weekday - current_weekday
         else:
-            days_ahead = 7 - (current_weekday - target_weekday)
+            days_ahead = 7 - current_weekday + target_weekday
         
         return base_date + timedelta(days=days_ahead)
     
     def _extract_time(self, content: str) -> Optional[str]:
-        for pattern in self.time_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                groups = match.groups()
-                
-                try:
-                    if len(groups) >= 3:
-                        hour = int(groups[0])
-                        minute = int(groups[1])
-                        period = groups[2].upper()
-                        
-                        if period == 'PM' and hour != 12:
-                            hour += 12
-                        elif period == 'AM' and hour == 12:
-                            hour = 0
-                            
-                        return f"{hour:02d}:{minute:02d}"
-                        
-                    elif len(groups) >= 2:
-                        hour = int(groups[0])
-                        period = groups[1].upper()
-                        
-                        if period == 'PM' and hour != 12:
-                            hour += 12
-                        elif period == 'AM' and hour == 12:
-                            hour = 0
-                            
-                        return f"{hour:02d}:00"
-                        
-                except (ValueError, IndexError) as e:
-                    print(f"Time parsing error: {e}")
-                    continue
-        
-        return None
+        return extract_email_features(content).suggested_time
     
     def _extract_duration(self, content: str) -> int:
-        for pattern in self.duration_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                try:
-                    groups = match.groups()
-                    number = int(groups[0])
-                    unit = groups[1].lower() if len(groups) > 1 else 'minutes'
-                    
-                    if 'hour' in unit:
-                        return number * 60
-                    else:
-                        return number
-                except (ValueError, IndexError):
-                    continue
-        
-        return 30
+        duration_minutes = extract_email_features(content).duration_minutes
+        return duration_minutes if duration_minutes is not None else 30
     
     def _determine_urgency(self, content: str) -> str:
-        content_lower = content.lower()
+        features = extract_email_features(content)
         
         urgent_keywords = ['urgent', 'asap', 'immediately', 'emergency', 'critical']
         high_keywords = ['important', 'priority', 'deadline', 'soon']
         
-        if any(keyword in content_lower for keyword in urgent_keywords):
+        if features.has_any(urgent_keywords):
             return 'high'
-        elif any(keyword in content_lower for keyword in high_keywords):
+        elif features.has_any(high_keywords):
             return 'medium'
         else:
             return 'low'
     
     def _determine_meeting_type(self, content: str) -> str:
-        content_lower = content.lower()
+        features = extract_email_features(content)
         
-        if any(keyword in content_lower for keyword in ['standup', 'daily', 'scrum']):
+        if features.has_any(['standup', 'daily', 'scrum']):
             return 'standup'
-        elif any(keyword in content_lower for keyword in ['review', 'retrospective', 'demo']):
+        elif features.has_any(['review', 'retrospective', 'demo']):
             return 'review'
-        elif any(keyword in content_lower for keyword in ['planning', 'brainstorm', 'strategy']):
+        elif features.has_any(['planning', 'brainstorm', 'strategy']):
             return 'planning'
         else:
-            return 'other'
\ No newline at end of file
+            return 'other'
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+from typing import Any, Coroutine
+
+
+class BackgroundEventLoop:
+    """One event loop running forever on a daemon thread.
+
+    Sync callers (the Flask views) submit coroutines to it instead of calling
+    asyncio.run per request, so aiohttp sessions, batchers and other loop-bound
+    state in the agents survive between requests.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="background-event-loop", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro: Coroutine, timeout: float = None) -> Any:
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        return future.result(timeout)
+
+    def stop(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+
+_background_loop = BackgroundEventLoop()
+
+def run_coroutine(coro: Coroutine, timeout: float = None) -> Any:
+    return _background_loop.run(coro, timeout)
@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class CompletionCache:
+    """LRU cache of LLM completions with a byte budget and per-entry TTL.
+
+    Entries live in memory; when db_path is set they are also written to a
+    sqlite file so completions (email parses in particular) survive restarts.
+    The file is held to the same byte budget, keeping the newest rows. The
+    *_async methods run the sqlite work in a worker thread so it stays off the
+    event loop.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl_seconds: float = 3600, db_path: str = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._db_bytes = 0
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS completions "
+                "(key TEXT PRIMARY KEY, value TEXT, expires_at REAL, size INTEGER)"
+            )
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(completions)")]
+            if 'size' not in columns:
+                self._db.execute("ALTER TABLE completions ADD COLUMN size INTEGER")
+                self._db.execute("UPDATE completions SET size = length(key) + length(CAST(value AS BLOB))")
+            self._db.execute("DELETE FROM completions WHERE expires_at < ?", (time.time(),))
+            self._trim_db()
+            self._db.commit()
+
+    @staticmethod
+    def make_key(model: str, prompt: str, system_prompt: Optional[str],
+                 temperature: float, top_p: float, max_tokens: int) -> str:
+        material = json.dumps(
+            [model, prompt, system_prompt, temperature, top_p, max_tokens],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[str]:
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    return value
+                self._remove(key)
+        return None
+
+    def _load(self, key: str) -> Optional[str]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM completions WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+
+        with self._lock:
+            self._store(key, row[0], row[1])
+        return row[0]
+
+    def _count(self, value: Optional[str]) -> Optional[str]:
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._lookup(key)
+        if value is None and self._db is not None:
+            value = self._load(key)
+        return self._count(value)
+
+    async def get_async(self, key: str) -> Optional[str]:
+        value = self._lookup(key)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._load, key)
+        return self._count(value)
+
+    def _persist(self, key: str, value: str, expires_at: float):
+        size = self._entry_size(key, value)
+        with self._db_lock:
+            replaced = self._db.execute("SELECT size FROM completions WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO completions (key, value, expires_at, size) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, size)
+            )
+            self._db_bytes += size - (replaced[0] if replaced else 0)
+            if self._db_bytes > self.max_bytes:
+                self._trim_db()
+            self._db.commit()
+
+    def _trim_db(self):
+        """Drop the oldest rows until the file is under 90% of max_bytes; the caller commits."""
+        self._db.execute(
+            "DELETE FROM completions WHERE key IN ("
+            "SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY expires_at DESC, key) AS kept "
+            "FROM completions) WHERE kept > ?)",
+            (int(self.max_bytes * 0.9),)
+        )
+        self._db_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+
+    def set(self, key: str, value: str):
+        expires_at = time.time() + self.ttl_seconds
+
+        with self._lock:
+            self._store(key, value, expires_at)
+
+        if self._db is not None:
+            self._persist(key, value, expires_at)
+
+    async def set_async(self, key: str, value: str):
+        expires_at = time.time() + self.ttl_seconds
+
+        with self._lock:
+            self._store(key, value, expires_at)
+
+        if self._db is not None:
+            await asyncio.to_thread(self._persist, key, value, expires_at)
+
+    def _store(self, key: str, value: str, expires_at: float):
+        if key in self._entries:
+            self._remove(key)
+
+        size = self._entry_size(key, value)
+        if size > self.max_bytes:
+            return
+
+        self._entries[key] = (expires_at, value)
+        self._bytes += size
+
+        while self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        _, value = self._entries.pop(key)
+        self._bytes -= self._entry_size(key, value)
+
+    def _entry_size(self, key: str, value: str) -> int:
+        return len(key) + len(value.encode('utf-8'))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'persistent': self._db is not None,
+                'db_bytes': self._db_bytes
+            }
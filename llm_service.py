@@ -1,8 +1,73 @@
 import requests
 import json
-from typing import Dict, List
+from typing import Dict, List, Tuple
 import time
+import random
 import asyncio
+import threading
+import aiohttp
+from requests.adapters import HTTPAdapter
+from llm_cache import CompletionCache
+from metrics import record_llm_call
+
+class CircuitBreaker:
+    """Tracks whether the vLLM server should be called.
+    
+    closed: calls go through; failure_threshold consecutive failures open it.
+    open: calls get fallback responses until reset_timeout has passed.
+    half_open: a single trial call is let through; its outcome closes or reopens.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self._transition(self.HALF_OPEN)
+            
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+    
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._trial_in_flight = False
+            if self.state != self.CLOSED:
+                self._transition(self.CLOSED)
+    
+    def record_failure(self, trip: bool = False):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if trip or self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                if self.state != self.OPEN:
+                    self._transition(self.OPEN)
+    
+    def _transition(self, state: str):
+        self.state = state
+        if state == self.OPEN:
+            print("LLM Service: Using fallback responses - vLLM server not available")
+        elif state == self.CLOSED:
+            print("LLM Service: Connected to vLLM server successfully")
 
 class LLMService:
     def __init__(self, config: Dict = None):
@@ -11,15 +76,72 @@ class LLMService:
         self.model_name = self.config.get('model_name', '/home/user/Models/deepseek-ai/deepseek-llm-7b-chat')
         self.timeout = self.config.get('timeout', 15)
         self.max_retries = self.config.get('max_retries', 1)
+        self.pool_size = self.config.get('pool_size', 10)
+        self.keepalive_timeout = self.config.get('keepalive_timeout', 30)
+        self.retry_backoff = self.config.get('retry_backoff', 0.5)
+        self.batch_size = self.config.get('batch_size', 16)
+        self.batch_max_wait = self.config.get('batch_max_wait_ms', 5) / 1000
         
-        self.use_mock = not self._test_connection()
-        if self.use_mock:
-            print("LLM Service: Using fallback responses - vLLM server not available")
-        else:
-            print("LLM Service: Connected to vLLM server successfully")
+        # Sync path: one keep-alive session with a bounded urllib3 pool
+        self._http = requests.Session()
+        self._http.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size))
+        self._http.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size))
+        self._http.headers.update({"Content-Type": "application/json"})
+        
+        # Async path: aiohttp session, created lazily on the running event loop
+        self._async_session = None
+        self._async_session_loop = None
+        self._async_stats = {'requests': 0, 'connections_created': 0, 'connections_reused': 0}
         
-        self._response_cache = {}
+        # Micro-batching of concurrent generate_async prompts into one /completions call
+        self._pending_batches = {}
+        self._batch_tasks = set()
+        self._batch_stats = {'batches': 0, 'prompts': 0}
         
+        self.cache = CompletionCache(
+            max_bytes=self.config.get('cache_max_bytes', 32 * 1024 * 1024),
+            ttl_seconds=self.config.get('cache_ttl_seconds', 3600),
+            db_path=self.config.get('cache_path')
+        )
+        
+        # Connection state is learned from traffic and from a background probe
+        # that starts on first use, so constructing the service never blocks
+        self.breaker = CircuitBreaker(
+            failure_threshold=self.config.get('failure_threshold', 3),
+            reset_timeout=self.config.get('reset_timeout', 30)
+        )
+        self.health_probe_interval = self.config.get('health_probe_interval', 15)
+        self._force_mock = self.config.get('use_mock', False)
+        self._prober = None
+        self._prober_stop = threading.Event()
+        
+    @property
+    def use_mock(self) -> bool:
+        return self._force_mock or self.breaker.state == CircuitBreaker.OPEN
+    
+    @use_mock.setter
+    def use_mock(self, value: bool):
+        self._force_mock = value
+    
+    def _allow_vllm(self) -> bool:
+        if self._force_mock:
+            return False
+        self._ensure_prober()
+        return self.breaker.allow_request()
+    
+    def _ensure_prober(self):
+        if self._prober is None:
+            self._prober = threading.Thread(target=self._probe_loop, name="llm-health-probe", daemon=True)
+            self._prober.start()
+    
+    def _probe_loop(self):
+        while not self._prober_stop.is_set():
+            if self._test_connection():
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure(trip=True)
+            self._prober_stop.wait(self.health_probe_interval)
+    
     def _test_connection(self) -> bool:
         try:
             test_payload = {
@@ -29,11 +151,10 @@ class LLMService:
                 "temperature": 0.1
             }
             
-            response = requests.post(
+            response = self._http.post(
                 f"{self.base_url}/completions",
                 json=test_payload,
-                timeout=3,
-                headers={"Content-Type": "application/json"}
+                timeout=3
             )
             
             return response.status_code == 200
@@ -41,27 +162,53 @@ class LLMService:
             return False
     
     def generate(self, prompt: str, system_prompt: str = None, max_tokens: int = 150) -> str:
-        if self.use_mock:
+        cache_key = self._cache_key(prompt, system_prompt, max_tokens)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            record_llm_call('cache')
+            return cached
+        
+        if not self._allow_vllm():
+            record_llm_call('fallback')
             return self._fallback_response(prompt)
         
         for attempt in range(self.max_retries + 1):
             try:
-                return self._call_vllm(prompt, system_prompt, max_tokens)
+                response, usage = self._call_vllm(prompt, system_prompt, max_tokens)
+                self.breaker.record_success()
+                self.cache.set(cache_key, response)
+                record_llm_call('vllm', usage)
+                return response
             except Exception as e:
                 if attempt == self.max_retries:
+                    self.breaker.record_failure()
                     print(f"LLM call failed, using fallback: {e}")
+                    record_llm_call('fallback')
                     return self._fallback_response(prompt)
-                time.sleep(0.5)
+                time.sleep(self._retry_delay(attempt))
         
+        record_llm_call('fallback')
         return self._fallback_response(prompt)
     
-    def _call_vllm(self, prompt: str, system_prompt: str = None, max_tokens: int = 150) -> str:
+    def _retry_delay(self, attempt: int) -> float:
+        # Full jitter: spreads retries from concurrent callers instead of
+        # having them all hit a recovering server at the same instant
+        return random.uniform(0, self.retry_backoff * (2 ** attempt))
+    
+    def _cache_key(self, prompt: str, system_prompt: str = None, max_tokens: int = 150) -> str:
+        payload = self._build_payload(prompt, system_prompt, max_tokens)
+        return CompletionCache.make_key(
+            payload['model'], payload['prompt'], system_prompt,
+            payload['temperature'], payload['top_p'], payload['max_tokens']
+        )
+    
+    def _build_payload(self, prompt: str, system_prompt: str = None, max_tokens: int = 150) -> Dict:
         if system_prompt:
             formatted_prompt = f"System: {system_prompt}\n\nUser: {prompt}\n\nAssistant:"
         else:
             formatted_prompt = f"User: {prompt}\n\nAssistant:"
         
-        payload = {
+        return {
             "model": self.model_name,
             "prompt": formatted_prompt,
             "max_tokens": max_tokens,
@@ -70,31 +217,180 @@ class LLMService:
             "stop": ["\nUser:", "\nSystem:", "User:", "System:"],
             "stream": False
         }
+    
+    def _parse_completion(self, status: int, result: Dict) -> str:
+        return self._parse_completions(status, result, 1)[0]
+    
+    def _parse_completions(self, status: int, result: Dict, prompt_count: int) -> List[str]:
+        if status != 200:
+            raise Exception(f"vLLM API error: {status}")
+        
+        if 'choices' not in result or len(result['choices']) < prompt_count:
+            raise Exception("No response from vLLM")
         
-        response = requests.post(
+        # With a prompt list, each choice's index is the position of its prompt
+        choices = sorted(result['choices'], key=lambda choice: choice.get('index', 0))
+        return [choice['text'].strip() for choice in choices[:prompt_count]]
+    
+    def _split_usage(self, usage: Dict, prompt_count: int) -> List[Dict]:
+        # vLLM reports one usage total for a batched call; each prompt is
+        # charged an equal share of it
+        usage = usage or {}
+        return [
+            {
+                'prompt_tokens': usage.get('prompt_tokens', 0) / prompt_count,
+                'completion_tokens': usage.get('completion_tokens', 0) / prompt_count
+            }
+            for _ in range(prompt_count)
+        ]
+    
+    def _call_vllm(self, prompt: str, system_prompt: str = None, max_tokens: int = 150) -> Tuple[str, Dict]:
+        payload = self._build_payload(prompt, system_prompt, max_tokens)
+        
+        response = self._http.post(
             f"{self.base_url}/completions",
             json=payload,
-            timeout=self.timeout,
-            headers={"Content-Type": "application/json"}
+            timeout=self.timeout
         )
         
-        if response.status_code != 200:
-            raise Exception(f"vLLM API error: {response.status_code}")
+        result = response.json() if response.status_code == 200 else {}
+        return self._parse_completion(response.status_code, result), result.get('usage')
+    
+    async def _call_vllm_async(self, prompt: str, system_prompt: str = None, max_tokens: int = 150) -> Tuple[str, Dict]:
+        payload = self._build_payload(prompt, system_prompt, max_tokens)
         
-        result = response.json()
+        if self.batch_size <= 1:
+            texts, usage = await self._post_completions(payload, 1)
+            return texts[0], usage
         
-        if 'choices' not in result or len(result['choices']) == 0:
-            raise Exception("No response from vLLM")
+        # Prompts with identical sampling params share a batch; it is sent when
+        # full or batch_max_wait after its first prompt, whichever comes first
+        loop = asyncio.get_running_loop()
+        batch_key = (loop, payload['max_tokens'], payload['temperature'], payload['top_p'], tuple(payload['stop']))
+        
+        batch = self._pending_batches.get(batch_key)
+        if batch is None:
+            batch = {'payload': payload, 'prompts': [], 'futures': []}
+            batch['timer'] = loop.call_later(self.batch_max_wait, self._flush_batch, batch_key)
+            self._pending_batches[batch_key] = batch
         
-        return result['choices'][0]['text'].strip()
+        future = loop.create_future()
+        batch['prompts'].append(payload['prompt'])
+        batch['futures'].append(future)
+        
+        if len(batch['prompts']) >= self.batch_size:
+            self._flush_batch(batch_key)
+        
+        return await future
+    
+    def _flush_batch(self, batch_key):
+        batch = self._pending_batches.pop(batch_key, None)
+        if batch is None:
+            return
+        
+        batch['timer'].cancel()
+        task = asyncio.ensure_future(self._send_batch(batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+    
+    async def _send_batch(self, batch: Dict):
+        prompts = batch['prompts']
+        payload = dict(batch['payload'], prompt=prompts if len(prompts) > 1 else prompts[0])
+        
+        try:
+            texts, usage = await self._post_completions(payload, len(prompts))
+        except Exception as e:
+            # Every caller sees the failure and retries on its own schedule
+            for future in batch['futures']:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        self._batch_stats['batches'] += 1
+        self._batch_stats['prompts'] += len(prompts)
+        
+        for future, text, usage_share in zip(batch['futures'], texts, self._split_usage(usage, len(prompts))):
+            if not future.done():
+                future.set_result((text, usage_share))
+    
+    async def _post_completions(self, payload: Dict, prompt_count: int) -> Tuple[List[str], Dict]:
+        session = await self._get_async_session()
+        
+        self._async_stats['requests'] += 1
+        async with session.post(
+            f"{self.base_url}/completions",
+            json=payload,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        ) as response:
+            result = await response.json() if response.status == 200 else {}
+            return self._parse_completions(response.status, result, prompt_count), result.get('usage')
+    
+    async def _get_async_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        
+        if self._async_session is not None and self._async_session_loop is not loop:
+            # Sessions are bound to the loop that created them; one request per
+            # asyncio.run() means each request brings a new loop. Once that loop
+            # is closed its transports are gone and close() only marks the
+            # session closed
+            old_session, self._async_session = self._async_session, None
+            try:
+                await old_session.close()
+            except RuntimeError as e:
+                print(f"Error closing previous LLM session: {e}")
+        
+        if self._async_session is None or self._async_session.closed:
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_create_end.append(self._on_connection_created)
+            trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+            
+            self._async_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=self.keepalive_timeout),
+                headers={"Content-Type": "application/json"},
+                trace_configs=[trace_config]
+            )
+            self._async_session_loop = loop
+        
+        return self._async_session
+    
+    async def _on_connection_created(self, session, context, params):
+        self._async_stats['connections_created'] += 1
+    
+    async def _on_connection_reused(self, session, context, params):
+        self._async_stats['connections_reused'] += 1
+    
+    async def aclose(self):
+        self._prober_stop.set()
+        if self._async_session is not None and not self._async_session.closed:
+            await self._async_session.close()
+        self._http.close()
+    
+    def connection_stats(self) -> Dict:
+        sync_requests = 0
+        sync_connections = 0
+        for adapter in self._http.adapters.values():
+            for pool_key in adapter.poolmanager.pools.keys():
+                pool = adapter.poolmanager.pools[pool_key]
+                sync_requests += pool.num_requests
+                sync_connections += pool.num_connections
+        
+        return {
+            'sync': {
+                'requests': sync_requests,
+                'connections_created': sync_connections,
+                'connections_reused': max(0, sync_requests - sync_connections)
+            },
+            'async': dict(self._async_stats),
+            'batching': dict(
+                self._batch_stats,
+                average_batch_size=(self._batch_stats['prompts'] / self._batch_stats['batches']
+                                    if self._batch_stats['batches'] else 0)
+            )
+        }
     
     def _fallback_response(self, prompt: str) -> str:
         prompt_lower = prompt.lower()
         
-        cache_key = hash(prompt_lower[:50])
-        if cache_key in self._response_cache:
-            return self._response_cache[cache_key]
-        
         response = ""
         
         if 'extract meeting details' in prompt_lower and 'email' in prompt_lower:
@@ -128,19 +424,44 @@ class LLMService:
         else:
             response = "I will process this request according to the scheduling requirements."
         
-        self._response_cache[cache_key] = response
         return response
     
     async def generate_async(self, prompt: str, system_prompt: str = None, max_tokens: int = 150) -> str:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.generate, prompt, system_prompt, max_tokens)
+        cache_key = self._cache_key(prompt, system_prompt, max_tokens)
+        cached = await self.cache.get_async(cache_key)
+        if cached is not None:
+            record_llm_call('cache')
+            return cached
+        
+        if not self._allow_vllm():
+            record_llm_call('fallback')
+            return self._fallback_response(prompt)
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                response, usage = await self._call_vllm_async(prompt, system_prompt, max_tokens)
+                self.breaker.record_success()
+                await self.cache.set_async(cache_key, response)
+                record_llm_call('vllm', usage)
+                return response
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.breaker.record_failure()
+                    print(f"LLM call failed, using fallback: {e}")
+                    record_llm_call('fallback')
+                    return self._fallback_response(prompt)
+                await asyncio.sleep(self._retry_delay(attempt))
+        
+        record_llm_call('fallback')
+        return self._fallback_response(prompt)
     
     def health_check(self) -> Dict:
         if self.use_mock:
             return {
                 "status": "degraded",
                 "service": "fallback",
-                "note": "vLLM server not available"
+                "note": "vLLM server not available",
+                "circuit": self.breaker.state
             }
         
         try:
@@ -149,10 +470,27 @@ class LLMService:
                 "status": "healthy",
                 "service": "vLLM",
                 "model": self.model_name,
-                "base_url": self.base_url
+                "base_url": self.base_url,
+                "circuit": self.breaker.state,
+                "connections": self.connection_stats(),
+                "cache": self.cache.stats()
             }
         except Exception as e:
             return {
                 "status": "unhealthy",
                 "error": str(e)
-            }
\ No newline at end of file
+            }
+
+_llm_services = {}
+_llm_services_lock = threading.Lock()
+
+def get_llm_service(config: Dict = None) -> LLMService:
+    """Process-wide LLMService for a config, so agents built without an explicit
+    client share one connection pool, cache and circuit breaker."""
+    registry_key = json.dumps(config or {}, sort_keys=True, default=str)
+    with _llm_services_lock:
+        service = _llm_services.get(registry_key)
+        if service is None:
+            service = LLMService(config)
+            _llm_services[registry_key] = service
+    return service
\ No newline at end of file
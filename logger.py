@@ -1,9 +1,10 @@
 import logging
+from config import LOGGING_CONFIG
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+logger.setLevel(LOGGING_CONFIG['level'].upper())
 console_handler = logging.StreamHandler()
 console_handler.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+formatter = logging.Formatter(LOGGING_CONFIG['format'])
 console_handler.setFormatter(formatter)
 logger.addHandler(console_handler)
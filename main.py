@@ -1,9 +1,12 @@
-from flask import Flask, request, jsonify
-import asyncio
+from flask import Flask, Response, request, jsonify
 import traceback
 import time
 from coordinator_agent import CoordinatorAgent
 from json_validator import sanitize_json_request
+from event_loop import run_coroutine
+from config import AGENT_CONFIG
+from metrics import PROMETHEUS_CONTENT_TYPE, render_metrics
+from profiling import PROFILE_HEADER, header_requests_profile
 
 app = Flask(__name__)
 
@@ -18,13 +21,16 @@ def receive():
         
         if not data:
             return jsonify({"error": "No JSON data provided"}), 400
+        if not isinstance(data, dict):
+            return jsonify({"error": "Expected a JSON object"}), 400
         
         request_id = data.get('Request_id', 'unknown')
         print(f"[{time.time():.3f}] Processing: {request_id}")
         
         sanitized_data = sanitize_json_request(data)
         
-        result = asyncio.run(coordinator.schedule_meeting(sanitized_data))
+        profile = header_requests_profile(request.headers.get(PROFILE_HEADER))
+        result = run_coroutine(coordinator.schedule_meeting(sanitized_data, profile=profile))
         
         elapsed = time.time() - start_time
         success = result.get('EventStart') is not None and 'error' not in result
@@ -48,6 +54,43 @@ def receive():
         }), 500
 
 
+@app.route('/receive/batch', methods=['POST'])
+def receive_batch():
+    start_time = time.time()
+    
+    data = request.get_json(silent=True)
+    meeting_requests = data.get('Requests') if isinstance(data, dict) else data
+    
+    if (not isinstance(meeting_requests, list) or not meeting_requests
+            or not all(isinstance(meeting_request, dict) for meeting_request in meeting_requests)):
+        return jsonify({"error": "Expected a JSON list of meeting requests"}), 400
+    if len(meeting_requests) > AGENT_CONFIG['max_batch_size']:
+        return jsonify({"error": f"Batch larger than {AGENT_CONFIG['max_batch_size']} requests"}), 400
+    
+    try:
+        print(f"[{time.time():.3f}] Processing batch of {len(meeting_requests)} requests")
+        
+        sanitized_requests = [sanitize_json_request(meeting_request) for meeting_request in meeting_requests]
+        results = run_coroutine(coordinator.schedule_batch(sanitized_requests))
+        
+        elapsed = time.time() - start_time
+        scheduled = sum(1 for result in results if result.get('EventStart') is not None)
+        print(f"[{time.time():.3f}] Batch completed in {elapsed:.2f}s: {scheduled}/{len(results)} scheduled")
+        
+        return jsonify(results)
+        
+    except Exception as e:
+        elapsed = time.time() - start_time
+        print(f"[{time.time():.3f}] Batch error after {elapsed:.2f}s: {e}")
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(render_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
 if __name__ == '__main__':
     
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
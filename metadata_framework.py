@@ -1,5 +1,6 @@
 import time
 import uuid
+from contextvars import ContextVar
 from datetime import datetime
 from typing import Dict, List, Any
 
@@ -16,17 +17,22 @@ class BusinessMetadata:
     def generate_business_summary(self) -> List[str]:
         return self.agent_interactions
 
-_business_metadata = None
+# One recorder per request: asyncio tasks inherit the context they are created
+# in, so every agent call fanned out from schedule_meeting writes to the
+# BusinessMetadata that request installed with reset_business_metadata()
+_business_metadata: ContextVar = ContextVar('business_metadata', default=None)
 
 def get_business_metadata() -> BusinessMetadata:
-    global _business_metadata
-    if _business_metadata is None:
-        _business_metadata = BusinessMetadata()
-    return _business_metadata
-
-def reset_business_metadata():
-    global _business_metadata
-    _business_metadata = BusinessMetadata()
+    metadata = _business_metadata.get()
+    if metadata is None:
+        metadata = BusinessMetadata()
+        _business_metadata.set(metadata)
+    return metadata
+
+def reset_business_metadata() -> BusinessMetadata:
+    metadata = BusinessMetadata()
+    _business_metadata.set(metadata)
+    return metadata
 
 def record_coordinator(action: str, outcome: str, reasoning: str):
     get_business_metadata().record_interaction("Coordinator", action, outcome, reasoning)
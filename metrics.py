@@ -0,0 +1,238 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+TOKEN_BUCKETS = (0, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _format_labels(label_names: Tuple[str, ...], label_values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(label_names, label_values) if value != '']
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+                self._series[key] = series
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series_items = sorted((key, dict(series, buckets=list(series['buckets'])))
+                                  for key, series in self._series.items())
+        for key, series in series_items:
+            for bound, count in zip(self.buckets, series['buckets']):
+                labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {count}"
+            labels = _format_labels(self.label_names, key, 'le="+Inf"')
+            yield f"{self.name}_bucket{labels} {series['count']}"
+            yield f"{self.name}_sum{_format_labels(self.label_names, key)} {repr(series['sum'])}"
+            yield f"{self.name}_count{_format_labels(self.label_names, key)} {series['count']}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, help_text: str, label_names: Iterable[str] = ()) -> Counter:
+        metric = Counter(name, help_text, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, label_names: Iterable[str] = (),
+                  buckets=DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, label_names, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'scheduler_stage_seconds', 'Time spent in each scheduling stage', ('stage', 'path')
+)
+REQUESTS_TOTAL = REGISTRY.counter(
+    'scheduler_requests_total', 'Scheduling requests by outcome', ('outcome',)
+)
+LLM_CALLS_TOTAL = REGISTRY.counter(
+    'scheduler_llm_calls_total', 'LLM generate calls by where the answer came from', ('source',)
+)
+LLM_TOKENS_TOTAL = REGISTRY.counter(
+    'scheduler_llm_tokens_total', 'Tokens reported by vLLM', ('kind',)
+)
+LLM_CALLS_PER_REQUEST = REGISTRY.histogram(
+    'scheduler_llm_calls_per_request', 'LLM generate calls made while handling one request', buckets=COUNT_BUCKETS
+)
+LLM_TOKENS_PER_REQUEST = REGISTRY.histogram(
+    'scheduler_llm_tokens_per_request', 'vLLM tokens used while handling one request', buckets=TOKEN_BUCKETS
+)
+
+
+class RequestMetrics:
+    """Stage timings and LLM usage of one request, for its response MetaData."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.llm_calls = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def add_stage(self, stage: str, seconds: float):
+        with self._lock:
+            entry = self.stages.setdefault(stage, {'seconds': 0.0, 'count': 0})
+            entry['seconds'] += seconds
+            entry['count'] += 1
+
+    def add_llm_call(self, source: str, prompt_tokens: float = 0, completion_tokens: float = 0):
+        with self._lock:
+            self.llm_calls[source] = self.llm_calls.get(source, 0) + 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'stages_ms': {
+                    stage: {'total': round(entry['seconds'] * 1000, 3), 'count': entry['count']}
+                    for stage, entry in self.stages.items()
+                },
+                'llm_calls': dict(self.llm_calls),
+                'llm_tokens': {'prompt': round(self.prompt_tokens), 'completion': round(self.completion_tokens)}
+            }
+
+
+# Like the reasoning recorder, request metrics follow the request's context;
+# worker threads see them when started through asyncio.to_thread or map_users
+_request_metrics: ContextVar = ContextVar('request_metrics', default=None)
+
+
+def begin_request() -> RequestMetrics:
+    request_metrics = RequestMetrics()
+    _request_metrics.set(request_metrics)
+    return request_metrics
+
+
+def finish_request(request_metrics: RequestMetrics, outcome: str):
+    elapsed = time.perf_counter() - request_metrics.started
+    STAGE_SECONDS.observe(elapsed, stage='total')
+    request_metrics.add_stage('total', elapsed)
+    REQUESTS_TOTAL.inc(outcome=outcome)
+    LLM_CALLS_PER_REQUEST.observe(sum(request_metrics.llm_calls.values()))
+    LLM_TOKENS_PER_REQUEST.observe(request_metrics.prompt_tokens + request_metrics.completion_tokens)
+
+
+def current_request_metrics() -> RequestMetrics:
+    return _request_metrics.get()
+
+
+class Span:
+    def __init__(self, stage: str, path: str = ''):
+        self.stage = stage
+        self.path = path
+        self.seconds = 0.0
+
+
+@contextmanager
+def span(stage: str, path: str = ''):
+    """Time the block as stage; path may be set on the yielded Span before it ends."""
+    timer = Span(stage, path)
+    started = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        timer.seconds = time.perf_counter() - started
+        STAGE_SECONDS.observe(timer.seconds, stage=stage, path=timer.path)
+        request_metrics = _request_metrics.get()
+        if request_metrics is not None:
+            request_metrics.add_stage(f"{stage}:{timer.path}" if timer.path else stage, timer.seconds)
+
+
+def timed(stage: str, path: str = ''):
+    """Decorator form of span for plain functions."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage, path):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_llm_call(source: str, usage: Dict = None):
+    prompt_tokens = (usage or {}).get('prompt_tokens') or 0
+    completion_tokens = (usage or {}).get('completion_tokens') or 0
+
+    LLM_CALLS_TOTAL.inc(source=source)
+    if prompt_tokens:
+        LLM_TOKENS_TOTAL.inc(prompt_tokens, kind='prompt')
+    if completion_tokens:
+        LLM_TOKENS_TOTAL.inc(completion_tokens, kind='completion')
+
+    request_metrics = _request_metrics.get()
+    if request_metrics is not None:
+        request_metrics.add_llm_call(source, prompt_tokens, completion_tokens)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -68,6 +68,7 @@ class UserPreferences(BaseModel):
     avoid_lunch: bool = Field(default=True, description="Avoid lunch hours")
     seniority_weight: float = Field(default=0.5, description="Seniority weight for prioritization")
     avoid_back_to_back: bool = Field(default=True, description="Avoid back-to-back meetings")
+    weekly_pattern: Optional[Dict[str, Dict[str, Any]]] = Field(default=None, description="Per-weekday preference overrides, e.g. {'friday': {'preferred_times': ['morning']}}")
 
 class SchedulingResponse(BaseModel):
     Request_id: str
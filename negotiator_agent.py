@@ -1,38 +1,63 @@
 import asyncio
+import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
-from llm_service import LLMService
+from llm_service import get_llm_service
 from email_parser import EmailParser
+from email_features import extract_email_features
 import pytz
 from metadata_framework import record_negotiator, record_selection
+from schedule_types import Slot
+from metrics import span, timed
+from logger import logger
+from config import AGENT_CONFIG, CALENDAR_CONFIG
 
 class NegotiatorAgent:
     def __init__(self, llm_client=None):
-        self.llm = llm_client or LLMService()
+        self.llm = llm_client or get_llm_service()
         self.email_parser = EmailParser(llm_client)
         self.default_timezone = pytz.timezone('Asia/Kolkata')
+        self.max_concurrent_evaluations = AGENT_CONFIG['max_concurrent_evaluations']
+        self.min_candidate_slots = AGENT_CONFIG['min_candidate_slots']
     
-    def _extract_urgency_from_email(self, email_content: str) -> str:
-        content_lower = email_content.lower()
+    async def _gather_participants(self, participants: List, call, semaphore: asyncio.Semaphore = None) -> List:
+        # Runs call(participant) for everyone at once, at most max_concurrent_evaluations
+        # in flight. Results keep participant order; a failure comes back as the
+        # exception object so callers can isolate it per participant as before.
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrent_evaluations)
+        
+        async def bounded(participant):
+            async with semaphore:
+                return await call(participant)
+        
+        results = await asyncio.gather(*(bounded(p) for p in participants), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+        return results
+    
+    def extract_urgency_from_email(self, email_content: str) -> str:
+        features = extract_email_features(email_content)
         
         urgent_keywords = ['urgent', 'asap', 'immediately', 'emergency', 'critical', 'rush']
         high_keywords = ['important', 'priority', 'soon', 'deadline', 'time-sensitive']
         low_keywords = ['when convenient', 'sometime', 'no rush', 'flexible']
         
-        if any(keyword in content_lower for keyword in urgent_keywords):
+        if features.has_any(urgent_keywords):
             return 'urgent'
-        elif any(keyword in content_lower for keyword in high_keywords):
+        elif features.has_any(high_keywords):
             return 'high'
-        elif any(keyword in content_lower for keyword in low_keywords):
+        elif features.has_any(low_keywords):
             return 'low'
         else:
             return 'medium'
     
-    async def negotiate_meeting(self, participants: List, meeting_request: Dict) -> Dict:
+    async def negotiate_meeting(self, participants: List, meeting_request: Dict, parsed_email: Dict = None) -> Dict:
         duration_mins = int(meeting_request.get('Duration_mins', 30))
         email_content = meeting_request.get('EmailContent', '')
+        horizon_days = int(meeting_request.get('Search_horizon_days', 1))
         
-        urgency = self._extract_urgency_from_email(email_content)
+        urgency = self.extract_urgency_from_email(email_content)
         
         print(f"Negotiation started: {len(participants)} participants, urgency: {urgency}")
         
@@ -42,7 +67,10 @@ class NegotiatorAgent:
             reasoning="Analyzed email content for urgency level and time requirements"
         )
         
-        parsed_email = self.email_parser.parse_email(email_content)
+        if parsed_email is None:
+            parsed_email = await self.email_parser.parse_email_async(email_content, meeting_request.get('Datetime'))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Email parse paths: %s", self.email_parser.path_stats()['shares'])
         target_date = parsed_email.get('suggested_date', self._get_default_date())
         requested_time = self._build_requested_time(parsed_email, target_date, duration_mins)
         
@@ -50,9 +78,10 @@ class NegotiatorAgent:
         
         if requested_time and requested_time.get('start'):
             print("Evaluating specifically requested time")
-            initial_result = await self._evaluate_specific_time_with_urgency(
-                participants, requested_time, duration_mins, urgency, email_content
-            )
+            with span('requested_time_evaluation'):
+                initial_result = await self._evaluate_specific_time_with_urgency(
+                    participants, requested_time, duration_mins, urgency, email_content
+                )
             
             if initial_result['success']:
                 requested_time_display = datetime.fromisoformat(requested_time['start']).strftime('%I:%M %p')
@@ -91,12 +120,13 @@ class NegotiatorAgent:
         )
         
         alternative_slots = await self._find_alternative_slots_with_urgency(
-            participants, target_date, duration_mins, urgency
+            participants, target_date, duration_mins, urgency, horizon_days,
+            self.requester_timezone(participants, meeting_request)
         )
         
         print(f"Alternative slots found: {len(alternative_slots)}")
         for i, slot in enumerate(alternative_slots[:3]):
-            print(f"   {i+1}. {slot['time_display']} (score: {slot['overall_score']:.2f})")
+            print(f"   {i+1}. {self._format_time_display(slot, horizon_days > 1)} (score: {slot.overall_score:.2f})")
         
         if not alternative_slots:
             if urgency in ['urgent', 'high']:
@@ -116,14 +146,15 @@ class NegotiatorAgent:
             
             return self._create_failure_response(meeting_request, f"No available slots found despite {urgency} priority")
         
-        best_slot = await self._negotiate_best_slot_with_urgency(
-            participants, alternative_slots, urgency, email_content
-        )
+        with span('final_evaluation'):
+            best_slot = await self._negotiate_best_slot_with_urgency(
+                participants, alternative_slots, urgency, email_content, horizon_days > 1
+            )
         
         if not best_slot:
             return self._create_failure_response(meeting_request, "Could not achieve acceptable consensus")
         
-        selected_time = best_slot['slot']['time_display']
+        selected_time = best_slot['time_display']
         selection_reasoning = self._create_urgency_aware_selection_reasoning(
             best_slot, alternative_slots, participants, urgency
         )
@@ -137,8 +168,8 @@ class NegotiatorAgent:
         record_selection(
             selected_slot={
                 'time_display': selected_time,
-                'start_time': best_slot['slot']['start_time'],
-                'end_time': best_slot['slot']['end_time']
+                'start_time': best_slot['slot'].start_iso(),
+                'end_time': best_slot['slot'].end_iso()
             },
             reasoning=selection_reasoning
         )
@@ -150,13 +181,15 @@ class NegotiatorAgent:
         evaluations = []
         conflicts = []
         
-        for participant in participants:
+        results = await self._gather_participants(
+            participants,
+            lambda participant: participant.evaluate_proposal(requested_time, context=context, urgency=urgency)
+        )
+        
+        for participant, evaluation in zip(participants, results):
             try:
-                evaluation = await participant.evaluate_proposal(
-                    requested_time, 
-                    context=context, 
-                    urgency=urgency
-                )
+                if isinstance(evaluation, Exception):
+                    raise evaluation
                 evaluations.append(evaluation)
                 
                 if evaluation['decision'] == 'REJECT':
@@ -203,13 +236,16 @@ class NegotiatorAgent:
         urgent_evaluations = []
         accommodations = []
         
-        for participant in participants:
+        urgent_context = f"URGENT REQUEST: {context}. Please consider if you can accommodate this urgent meeting despite conflicts."
+        results = await self._gather_participants(
+            participants,
+            lambda participant: participant.evaluate_proposal(requested_time, context=urgent_context, urgency='urgent')
+        )
+        
+        for participant, urgent_evaluation in zip(participants, results):
             try:
-                urgent_evaluation = await participant.evaluate_proposal(
-                    requested_time,
-                    context=f"URGENT REQUEST: {context}. Please consider if you can accommodate this urgent meeting despite conflicts.",
-                    urgency='urgent'
-                )
+                if isinstance(urgent_evaluation, Exception):
+                    raise urgent_evaluation
                 
                 urgent_evaluations.append(urgent_evaluation)
                 
@@ -248,121 +284,176 @@ class NegotiatorAgent:
         
         return {'success': False, 'reason': 'Urgent negotiation failed to achieve sufficient accommodation'}
     
+    def requester_timezone(self, participants: List, meeting_request: Dict):
+        for participant in participants:
+            if participant.email == meeting_request.get('From'):
+                return participant.timezone
+        return self.default_timezone
+    
     async def _find_alternative_slots_with_urgency(self, participants: List, target_date: str, 
-                                                 duration_mins: int, urgency: str) -> List[Dict]:
-        all_available_slots = {}
+                                                 duration_mins: int, urgency: str, horizon_days: int = 1,
+                                                 requester_tz=None) -> List[Slot]:
+        search_dates = self.search_dates(target_date, horizon_days)
+        day_offsets = {search_date: day_offset for day_offset, search_date in enumerate(search_dates)}
         
-        print(f"Getting slots from {len(participants)} participants for {target_date}")
+        print(f"Getting slots from {len(participants)} participants for {', '.join(search_dates)}")
         
-        for participant in participants:
-            try:
-                if urgency in ['urgent', 'high']:
-                    slots = await participant.suggest_alternatives(
-                        datetime.strptime(target_date, '%Y-%m-%d').date(), 
-                        duration_mins, 
-                        urgency=urgency
-                    )
-                else:
-                    slots = participant.find_available_slots(target_date, duration_mins)
-                
-                all_available_slots[participant.email] = slots
-                print(f"  {participant.email}: {len(slots)} slots available")
-                
-            except Exception as e:
-                print(f"Error getting slots for {participant.email}: {e}")
-                all_available_slots[participant.email] = []
+        # One call per participant covers the whole horizon, and the slots of
+        # every day are intersected together
+        async def participant_slots(participant):
+            return participant.slots_for_dates(search_dates, duration_mins, urgency)
         
-        common_slots = self._find_common_slots_fixed(all_available_slots, urgency)
+        with span('slot_search'):
+            results = await self._gather_participants(participants, participant_slots)
+        
+        all_available_slots = {}
+        slot_days = {}
+        for participant, slots_by_date in zip(participants, results):
+            if isinstance(slots_by_date, Exception):
+                print(f"Error getting slots for {participant.email}: {slots_by_date}")
+                all_available_slots[participant.email] = []
+                continue
+            
+            participant_slots = []
+            for search_date, day_slots in slots_by_date.items():
+                for slot in day_slots:
+                    slot_days.setdefault(slot.key, day_offsets[search_date])
+                participant_slots.extend(day_slots)
+            all_available_slots[participant.email] = participant_slots
+            print(f"  {participant.email}: {len(participant_slots)} slots available")
+        
+        common_slots = self._find_common_slots_fixed(all_available_slots, urgency, requester_tz)
         print(f"Found {len(common_slots)} common slots after intersection")
         
-        scored_slots = []
         for slot in common_slots:
+            slot.day_offset = slot_days[slot.key]
+        
+        # Later days only count while the earlier ones have not produced enough
+        # candidates, so only their slots go on to consensus scoring
+        candidate_slots = []
+        for day_offset, search_date in enumerate(search_dates):
+            candidate_slots.extend(slot for slot in common_slots if slot.day_offset == day_offset)
+            if len(candidate_slots) >= self.min_candidate_slots:
+                break
+            if day_offset + 1 < len(search_dates):
+                print(f"Only {len(candidate_slots)} candidate slots through {search_date}, extending search")
+        
+        scored_slots = await self._score_common_slots(participants, candidate_slots, urgency)
+        
+        final_slots = sorted(scored_slots, key=lambda slot: (slot.day_offset, -slot.overall_score))[:10]
+        print(f"Returning {len(final_slots)} scored and ranked slots")
+        
+        return final_slots
+    
+    def search_dates(self, target_date: str, horizon_days: int) -> List[str]:
+        """target_date itself, then the following working days inside the horizon."""
+        first_date = datetime.strptime(target_date, '%Y-%m-%d').date()
+        search_dates = [target_date]
+        
+        for offset in range(1, horizon_days):
+            day = first_date + timedelta(days=offset)
+            if day.weekday() in CALENDAR_CONFIG['working_days']:
+                search_dates.append(day.strftime('%Y-%m-%d'))
+        
+        return search_dates
+    
+    async def _score_common_slots(self, participants: List, common_slots: List[Slot], urgency: str) -> List[Slot]:
+        # Score every common slot at once; one semaphore bounds the whole fan-out
+        semaphore = asyncio.Semaphore(self.max_concurrent_evaluations)
+        with span('consensus_scoring'):
+            consensus_scores = await asyncio.gather(
+                *(self._calculate_consensus_fast(participants, slot, urgency, semaphore) for slot in common_slots),
+                return_exceptions=True
+            )
+        
+        scored_slots = []
+        for slot, consensus_score in zip(common_slots, consensus_scores):
             try:
-                consensus_score = await self._calculate_consensus_fast(participants, slot, urgency)
-                urgency_bonus = self._calculate_urgency_bonus(slot, urgency)
-                
-                scored_slots.append({
-                    'start_time': slot['start_time'],
-                    'end_time': slot['end_time'],
-                    'consensus_score': consensus_score,
-                    'urgency_bonus': urgency_bonus,
-                    'overall_score': consensus_score + urgency_bonus,
-                    'time_display': self._format_time_display(slot['start_time'])
-                })
+                if isinstance(consensus_score, Exception):
+                    raise consensus_score
+                slot.consensus_score = consensus_score
+                slot.urgency_bonus = self.calculate_urgency_bonus(slot, urgency)
+                slot.overall_score = consensus_score + slot.urgency_bonus
+                scored_slots.append(slot)
             except Exception as e:
                 print(f"Error scoring slot: {e}")
                 continue
         
-        final_slots = sorted(scored_slots, key=lambda x: x['overall_score'], reverse=True)[:10]
-        print(f"Returning {len(final_slots)} scored and ranked slots")
-        
-        return final_slots
+        return scored_slots
     
-    def _find_common_slots_fixed(self, all_slots: Dict, urgency: str) -> List[Dict]:
+    @timed('intersection')
+    def _find_common_slots_fixed(self, all_slots: Dict, urgency: str, requester_tz=None) -> List[Slot]:
         if not all_slots:
             print("No participant slots provided")
             return []
         
         print(f"Finding common slots among {len(all_slots)} participants")
         
-        all_time_slots = set()
+        # One dict per participant keyed on epoch (start, end), so slots shown
+        # in different timezones for the same instant join on the same key
+        slot_maps = []
         for participant_email, participant_slots in all_slots.items():
             print(f"   {participant_email}: {len(participant_slots)} slots")
+            slot_map = {}
             for slot in participant_slots:
-                if isinstance(slot, dict) and 'start_time' in slot and 'end_time' in slot:
-                    slot_key = (slot['start_time'], slot['end_time'])
-                    all_time_slots.add(slot_key)
-        
-        print(f"Total unique time slots: {len(all_time_slots)}")
+                if isinstance(slot, Slot):
+                    slot_map.setdefault(slot.key, slot)
+            slot_maps.append(slot_map)
+        
+        slot_maps.sort(key=len)
+        common_keys = set(slot_maps[0]).intersection(*slot_maps[1:])
+        
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            all_keys = set().union(*slot_maps)
+            logger.debug(f"Total unique time slots: {len(all_keys)}")
+            for slot_key in sorted(all_keys - common_keys):
+                available_count = sum(1 for slot_map in slot_maps if slot_key in slot_map)
+                logger.debug(f"Partial availability: {self._format_clock(slot_key[0])} - "
+                             f"Only {available_count}/{len(all_slots)} participants available")
+        
+        min_threshold = 0.1 if urgency == 'urgent' else 0.2
+        # Common slots are shown in the requester's timezone, whichever
+        # participant's slot map the intersection started from
+        slot_tz = requester_tz or self.default_timezone
         
         common_slots = []
-        for start_time, end_time in all_time_slots:
-            participants_with_slot = []
-            total_preference = 0
+        for slot_key in sorted(common_keys):
+            total_preference = sum(slot_map[slot_key].preference_score for slot_map in slot_maps)
+            avg_preference = total_preference / len(all_slots)
             
-            for participant_email, participant_slots in all_slots.items():
-                found_slot = None
-                for slot in participant_slots:
-                    if (slot.get('start_time') == start_time and 
-                        slot.get('end_time') == end_time):
-                        found_slot = slot
-                        break
-                
-                if found_slot:
-                    participants_with_slot.append(participant_email)
-                    total_preference += found_slot.get('preference_score', 0.5)
-            
-            if len(participants_with_slot) == len(all_slots):
-                avg_preference = total_preference / len(all_slots)
-                
-                min_threshold = 0.1 if urgency == 'urgent' else 0.2
-                
-                if avg_preference >= min_threshold:
-                    common_slots.append({
-                        'start_time': start_time,
-                        'end_time': end_time,
-                        'average_preference': avg_preference
-                    })
-                    
-                    start_dt = datetime.fromisoformat(start_time)
-                    print(f"   Common slot: {start_dt.strftime('%H:%M')} - ALL participants available (avg score: {avg_preference:.2f})")
-                else:
-                    start_dt = datetime.fromisoformat(start_time)
-                    print(f"   Low preference: {start_dt.strftime('%H:%M')} - Available but preference too low ({avg_preference:.2f})")
-            else:
-                start_dt = datetime.fromisoformat(start_time)
-                print(f"   Partial availability: {start_dt.strftime('%H:%M')} - Only {len(participants_with_slot)}/{len(all_slots)} participants available")
+            if avg_preference >= min_threshold:
+                common_slot = Slot(slot_key[0], slot_key[1], slot_tz)
+                common_slot.average_preference = avg_preference
+                common_slots.append(common_slot)
+                if debug_enabled:
+                    logger.debug(f"Common slot: {self._format_clock(slot_key[0])} - ALL participants available "
+                                 f"(avg score: {avg_preference:.2f})")
+            elif debug_enabled:
+                logger.debug(f"Low preference: {self._format_clock(slot_key[0])} - Available but preference too low "
+                             f"({avg_preference:.2f})")
         
         print(f"Final common slots: {len(common_slots)}")
         return common_slots
     
-    async def _calculate_consensus_fast(self, participants: List, slot: Dict, urgency: str) -> float:
+    def _format_clock(self, epoch: int) -> str:
+        return datetime.fromtimestamp(epoch, self.default_timezone).strftime('%H:%M')
+    
+    async def _calculate_consensus_fast(self, participants: List, slot: Slot, urgency: str,
+                                        semaphore: asyncio.Semaphore = None) -> float:
         total_score = 0
         valid_count = 0
         
-        for participant in participants:
+        results = await self._gather_participants(
+            participants,
+            lambda participant: participant.evaluate_proposal(slot, urgency=urgency),
+            semaphore
+        )
+        
+        for participant, evaluation in zip(participants, results):
             try:
-                evaluation = await participant.evaluate_proposal(slot, urgency=urgency)
+                if isinstance(evaluation, Exception):
+                    raise evaluation
                 score = evaluation.get('preference_score', 0)
                 
                 if urgency == 'urgent' and evaluation['decision'] in ['ACCEPT', 'CONDITIONAL_ACCEPT']:
@@ -377,9 +468,9 @@ class NegotiatorAgent:
         
         return total_score / valid_count if valid_count > 0 else 0
     
-    def _calculate_urgency_bonus(self, slot: Dict, urgency: str) -> float:
+    def calculate_urgency_bonus(self, slot: Slot, urgency: str) -> float:
         try:
-            hour = datetime.fromisoformat(slot['start_time']).hour
+            hour = slot.start_datetime().hour
             
             if urgency == 'urgent':
                 return 0.3 if 7 <= hour <= 20 else 0.1
@@ -396,9 +487,8 @@ class NegotiatorAgent:
         
         extended_options = []
         
-        for participant in participants:
-            try:
-                rescheduling_prompt = f"""
+        def rescheduling_request(participant):
+            rescheduling_prompt = f"""
                 URGENT MEETING ACCOMMODATION REQUEST
                 
                 No standard time slots are available for this {urgency} priority meeting on {target_date}.
@@ -412,8 +502,14 @@ class NegotiatorAgent:
                 
                 Respond with: RESCHEDULE_POSSIBLE|ACCEPT_OFF_HOURS|SUGGEST_ALTERNATIVE|CANNOT_ACCOMMODATE
                 """
-                
-                response = await self.llm.generate_async(rescheduling_prompt, max_tokens=50)
+            return self.llm.generate_async(rescheduling_prompt, max_tokens=50)
+        
+        responses = await self._gather_participants(participants, rescheduling_request)
+        
+        for participant, response in zip(participants, responses):
+            try:
+                if isinstance(response, Exception):
+                    raise response
                 
                 if 'RESCHEDULE_POSSIBLE' in response.upper():
                     extended_options.append({
@@ -461,20 +557,27 @@ class NegotiatorAgent:
         
         return {'success': False, 'reason': 'Extended urgent negotiation could not find viable accommodations'}
     
-    async def _negotiate_best_slot_with_urgency(self, participants: List, alternative_slots: List[Dict], 
-                                              urgency: str, context: str) -> Dict:
+    async def _negotiate_best_slot_with_urgency(self, participants: List, alternative_slots: List[Slot], 
+                                              urgency: str, context: str, include_date: bool = False) -> Dict:
         if not alternative_slots:
             return None
         
         print(f"Selecting best slot from {len(alternative_slots)} options")
         
         best_slot = alternative_slots[0]
-        print(f"Selected: {best_slot['time_display']} (score: {best_slot['overall_score']:.2f})")
+        time_display = self._format_time_display(best_slot, include_date)
+        print(f"Selected: {time_display} (score: {best_slot.overall_score:.2f})")
         
         final_evaluations = []
-        for participant in participants:
+        results = await self._gather_participants(
+            participants,
+            lambda participant: participant.evaluate_proposal(best_slot, context=context, urgency=urgency)
+        )
+        
+        for participant, evaluation in zip(participants, results):
             try:
-                evaluation = await participant.evaluate_proposal(best_slot, context=context, urgency=urgency)
+                if isinstance(evaluation, Exception):
+                    raise evaluation
                 final_evaluations.append(evaluation)
                 print(f"   {participant.email}: {evaluation['decision']} ({evaluation.get('preference_score', 0):.2f})")
             except Exception as e:
@@ -489,14 +592,15 @@ class NegotiatorAgent:
         return {
             'success': True,
             'slot': best_slot,
+            'time_display': time_display,
             'evaluations': final_evaluations,
-            'consensus_score': best_slot['overall_score'],
+            'consensus_score': best_slot.overall_score,
             'urgency_level': urgency
         }
     
-    def _create_urgency_aware_selection_reasoning(self, best_slot: Dict, all_slots: List[Dict], 
+    def _create_urgency_aware_selection_reasoning(self, best_slot: Dict, all_slots: List[Slot], 
                                                 participants: List, urgency: str) -> str:
-        selected_time = best_slot['slot']['time_display']
+        selected_time = best_slot['time_display']
         consensus_score = best_slot['consensus_score']
         
         reasoning_parts = []
@@ -515,7 +619,7 @@ class NegotiatorAgent:
         else:
             reasoning_parts.append("represents best available compromise given constraints")
         
-        hour = datetime.fromisoformat(best_slot['slot']['start_time']).hour
+        hour = best_slot['slot'].start_datetime().hour
         if 9 <= hour <= 17:
             reasoning_parts.append("scheduled during optimal business hours")
         elif urgency in ['urgent', 'high'] and (7 <= hour <= 20):
@@ -553,23 +657,17 @@ class NegotiatorAgent:
             print(f"Error building requested time: {e}")
             return None
     
-    def _create_success_response(self, result: Dict, meeting_request: Dict, alternatives: List[Dict]) -> Dict:
+    def _create_success_response(self, result: Dict, meeting_request: Dict, alternatives: List[Slot]) -> Dict:
         slot = result['slot']
+        if not isinstance(slot, Slot):
+            slot = Slot.from_iso(slot['start_time'], slot['end_time'])
         
+        # Slots stay as epoch objects here; the coordinator renders ISO strings
+        # for the one that goes into the response
         return {
             'success': True,
-            'scheduled_slot': {
-                'start_time': slot['start_time'],
-                'end_time': slot['end_time'],
-                'display_time': slot['time_display']
-            },
-            'alternatives_considered': [
-                {
-                    'start_time': alt['start_time'],
-                    'end_time': alt['end_time'],
-                    'time_display': alt['time_display']
-                } for alt in alternatives[:3]
-            ],
+            'scheduled_slot': slot,
+            'alternatives_considered': alternatives[:3],
             'negotiation_summary': {
                 'consensus_score': result['consensus_score'],
                 'total_participants': len(result['evaluations']),
@@ -586,7 +684,7 @@ class NegotiatorAgent:
             'negotiation_summary': {
                 'consensus_score': 0,
                 'total_participants': len(meeting_request.get('Attendees', [])),
-                'urgency_level': self._extract_urgency_from_email(meeting_request.get('EmailContent', '')),
+                'urgency_level': self.extract_urgency_from_email(meeting_request.get('EmailContent', '')),
                 'negotiation_type': 'failed'
             }
         }
@@ -594,9 +692,11 @@ class NegotiatorAgent:
     def _get_default_date(self) -> str:
         return (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
     
-    def _format_time_display(self, iso_time: str) -> str:
+    def _format_time_display(self, slot, include_date: bool = False) -> str:
         try:
-            dt = datetime.fromisoformat(iso_time)
+            dt = slot.start_datetime() if isinstance(slot, Slot) else datetime.fromisoformat(slot)
+            if include_date:
+                return dt.strftime("%a %d %b %H:%M IST")
             return dt.strftime("%H:%M IST")
         except:
-            return iso_time
\ No newline at end of file
+            return slot
\ No newline at end of file
@@ -1,124 +1,160 @@
 import asyncio
+import threading
 from datetime import datetime, timedelta
 import pytz
 from typing import List, Dict, Any
-from llm_service import LLMService
+from llm_service import get_llm_service
 from metadata_framework import record_participant
+from busy_index import BusyIntervalIndex
+from schedule_types import Slot
+from preference_table import compile_preferences
+
+# Urgent requests widen to extended hours when fewer working-hour slots are free
+MIN_STANDARD_SLOTS = 3
 
 class ParticipantAgent:
-    def __init__(self, email: str, calendar_data: List[Dict], preferences: Dict, llm_client=None):
+    def __init__(self, email: str, calendar_data: List[Dict], preferences: Dict, llm_client=None, event_resolver=None,
+                 busy_index: BusyIntervalIndex = None):
         self.email = email
         self.calendar = calendar_data
+        self.busy_index = busy_index if busy_index is not None else BusyIntervalIndex(calendar_data)
         self.preferences = preferences
-        self.llm = llm_client or LLMService()
+        self.preference_table = compile_preferences(preferences)
+        self.llm = llm_client or get_llm_service()
         self.timezone = pytz.timezone(preferences.get('timezone', 'Asia/Kolkata'))
         self._working_hours_cache = {}
+        self.event_resolver = event_resolver
+    
+    def reset(self, calendar_data: List[Dict], preferences: Dict = None, llm_client=None, event_resolver=None,
+              busy_index: BusyIntervalIndex = None):
+        self.calendar = calendar_data
+        self.event_resolver = event_resolver
+        self.busy_index = busy_index if busy_index is not None else BusyIntervalIndex(calendar_data)
+        self._working_hours_cache.clear()
+        
+        if preferences is not None and preferences != self.preferences:
+            self.preferences = preferences
+            self.preference_table = compile_preferences(preferences)
+            self.timezone = pytz.timezone(preferences.get('timezone', 'Asia/Kolkata'))
+        
+        if llm_client is not None:
+            self.llm = llm_client
         
     def find_available_slots(self, date_str: str, duration_mins: int) -> List[Dict]:
-        available_slots = []
-        target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+        return [slot.to_dict() for slot in self.available_slots(date_str, duration_mins)]
+    
+    def available_slots(self, date_str: str, duration_mins: int) -> List[Slot]:
+        available_slots = self.candidate_slots(date_str, duration_mins)
+        return sorted(available_slots, key=lambda slot: slot.preference_score, reverse=True)[:10]
+    
+    def _needs_extended_hours(self, available_slots: List[Slot], urgency: str) -> bool:
+        return urgency in ['urgent', 'high'] and len(available_slots) < MIN_STANDARD_SLOTS
+    
+    def candidate_slots(self, date_str: str, duration_mins: int, urgency: str = "medium") -> List[Slot]:
+        """Every free half-hour start in working hours, plus extended hours under the same rule as alternative_slots."""
+        available_slots = self._working_hour_slots([date_str], duration_mins)[date_str]
         
-        cache_key = target_date.isoformat()
-        if cache_key in self._working_hours_cache:
-            working_start, working_end = self._working_hours_cache[cache_key]
-        else:
-            working_start, working_end = self._get_working_hours_from_calendar(target_date)
-            self._working_hours_cache[cache_key] = (working_start, working_end)
+        if self._needs_extended_hours(available_slots, urgency):
+            target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+            available_slots.extend(self._find_extended_slots(target_date, duration_mins))
         
-        current_time = working_start
-        while current_time + timedelta(minutes=duration_mins) <= working_end:
-            slot_end = current_time + timedelta(minutes=duration_mins)
+        return available_slots
+    
+    def slots_for_dates(self, date_strs: List[str], duration_mins: int, urgency: str = "medium") -> Dict[str, List[Slot]]:
+        """Each date's slots as available_slots (or alternative_slots when urgent) would give them, from one sweep."""
+        slots_by_date = {}
+        for date_str, day_slots in self._working_hour_slots(date_strs, duration_mins).items():
+            day_slots = sorted(day_slots, key=lambda slot: slot.preference_score, reverse=True)[:10]
+            
+            if urgency in ['urgent', 'high']:
+                if self._needs_extended_hours(day_slots, urgency):
+                    target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+                    day_slots.extend(self._find_extended_slots(target_date, duration_mins))
+                day_slots = day_slots[:3]
             
-            if not self._has_conflict(current_time, slot_end):
-                preference_score = self._calculate_preference_score(current_time)
-                available_slots.append({
-                    'start_time': current_time.isoformat(),
-                    'end_time': slot_end.isoformat(),
-                    'preference_score': preference_score,
-                    'participant': self.email
-                })
+            slots_by_date[date_str] = day_slots
+        return slots_by_date
+    
+    def _working_hour_slots(self, date_strs: List[str], duration_mins: int) -> Dict[str, List[Slot]]:
+        # Candidate starts of every date go through the busy index in a single
+        # ascending sweep rather than one bisect per start
+        duration_seconds = duration_mins * 60
+        starts = []
+        for date_str in date_strs:
+            target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+            
+            cache_key = target_date.isoformat()
+            if cache_key in self._working_hours_cache:
+                working_start, working_end = self._working_hours_cache[cache_key]
+            else:
+                working_start, working_end = self._get_working_hours_from_calendar(target_date)
+                self._working_hours_cache[cache_key] = (working_start, working_end)
             
-            current_time += timedelta(minutes=30)
+            day_scores = self.preference_table.day(target_date.weekday())
+            current_time = working_start
+            while current_time + timedelta(minutes=duration_mins) <= working_end:
+                starts.append((int(current_time.timestamp()), date_str,
+                               day_scores[current_time.hour * 60 + current_time.minute]))
+                current_time += timedelta(minutes=30)
         
-        return sorted(available_slots, key=lambda x: x['preference_score'], reverse=True)[:10]
+        starts.sort(key=lambda start: start[0])
+        conflicts = self.busy_index.conflicts_many([start[0] for start in starts], duration_seconds)
+        
+        slots_by_date = {date_str: [] for date_str in date_strs}
+        for (slot_start, date_str, preference_score), conflict in zip(starts, conflicts):
+            if not conflict:
+                slots_by_date[date_str].append(Slot(
+                    slot_start,
+                    slot_start + duration_seconds,
+                    self.timezone,
+                    participant=self.email,
+                    preference_score=preference_score
+                ))
+        return slots_by_date
     
     def _get_working_hours_from_calendar(self, target_date):
         default_start = self.timezone.localize(datetime.combine(target_date, datetime.min.time().replace(hour=9)))
         default_end = self.timezone.localize(datetime.combine(target_date, datetime.min.time().replace(hour=18)))
         
-        for event in self.calendar:
-            if 'Off Hours' in event.get('Summary', ''):
-                event_start = datetime.fromisoformat(event['StartTime'].replace('Z', '+00:00'))
-                event_end = datetime.fromisoformat(event['EndTime'].replace('Z', '+00:00'))
-                
-                if event_start.tzinfo != self.timezone:
-                    event_start = event_start.astimezone(self.timezone)
-                    event_end = event_end.astimezone(self.timezone)
-                
-                if event_start.date() <= target_date <= event_end.date():
-                    if event_end.date() == target_date and event_end.hour <= 12:
-                        default_start = max(default_start, event_end)
-                    if event_start.date() == target_date and event_start.hour >= 12:
-                        default_end = min(default_end, event_start)
+        for off_start, off_end in self.busy_index.off_hours_intervals():
+            event_start = datetime.fromtimestamp(off_start, self.timezone)
+            event_end = datetime.fromtimestamp(off_end, self.timezone)
+            
+            if event_start.date() <= target_date <= event_end.date():
+                if event_end.date() == target_date and event_end.hour <= 12:
+                    default_start = max(default_start, event_end)
+                if event_start.date() == target_date and event_start.hour >= 12:
+                    default_end = min(default_end, event_start)
         
         return default_start, default_end
     
     def _has_conflict(self, start_time: datetime, end_time: datetime) -> bool:
-        for event in self.calendar:
-            event_start = datetime.fromisoformat(event['StartTime'].replace('Z', '+00:00'))
-            event_end = datetime.fromisoformat(event['EndTime'].replace('Z', '+00:00'))
-            
-            if event_start.tzinfo != start_time.tzinfo:
-                event_start = event_start.astimezone(start_time.tzinfo)
-                event_end = event_end.astimezone(start_time.tzinfo)
-            
-            buffer_mins = 5 if 'Off Hours' in event.get('Summary', '') else 10
-            buffered_start = start_time - timedelta(minutes=buffer_mins)
-            buffered_end = end_time + timedelta(minutes=buffer_mins)
-            
-            if not (buffered_end <= event_start or buffered_start >= event_end):
-                return True
-        
-        return False
+        return self.busy_index.has_conflict(int(start_time.timestamp()), int(end_time.timestamp()))
     
     def _calculate_preference_score(self, start_time: datetime) -> float:
-        score = 0.5
-        hour = start_time.hour
-        
-        preferred_times = self.preferences.get('preferred_times', [])
-        if 'morning' in preferred_times and 9 <= hour < 12:
-            score += 0.3
-        elif 'afternoon' in preferred_times and 13 <= hour < 17:
-            score += 0.3
-        
-        if self.preferences.get('avoid_lunch', False) and 12 <= hour < 14:
-            score -= 0.3
-        
-        seniority = self.preferences.get('seniority_weight', 0.5)
-        score = score * (0.8 + 0.4 * seniority)
-        
-        return max(0, min(1, score))
+        return self.preference_table.score(start_time)
     
-    async def evaluate_proposal(self, proposed_slot: Dict, context: str = "", urgency: str = "medium") -> Dict:
-        start_time = datetime.fromisoformat(proposed_slot['start_time'])
-        end_time = datetime.fromisoformat(proposed_slot['end_time'])
+    async def evaluate_proposal(self, proposed_slot, context: str = "", urgency: str = "medium") -> Dict:
+        if isinstance(proposed_slot, Slot):
+            start_time = proposed_slot.start_datetime()
+            slot_start, slot_end = proposed_slot.start, proposed_slot.end
+        else:
+            start_time = datetime.fromisoformat(proposed_slot['start_time'])
+            end_time = datetime.fromisoformat(proposed_slot['end_time'])
+            slot_start, slot_end = int(start_time.timestamp()), int(end_time.timestamp())
         
-        if self._has_conflict(start_time, end_time):
+        if self.busy_index.has_conflict(slot_start, slot_end):
             conflict_type = "meeting conflict"
-            for event in self.calendar:
-                event_start = datetime.fromisoformat(event['StartTime'].replace('Z', '+00:00'))
-                event_end = datetime.fromisoformat(event['EndTime'].replace('Z', '+00:00'))
-                
-                if event_start.tzinfo != start_time.tzinfo:
-                    event_start = event_start.astimezone(start_time.tzinfo)
-                    event_end = event_end.astimezone(start_time.tzinfo)
-                
-                if not (end_time <= event_start or start_time >= event_end):
-                    if 'Off Hours' in event.get('Summary', ''):
-                        conflict_type = "outside working hours"
-                    else:
-                        conflict_type = f"conflicts with {event['Summary']}"
-                    break
+            conflicting_event = self.busy_index.first_overlap(slot_start, slot_end)
+            if conflicting_event is not None and self.event_resolver is not None:
+                conflicting_event = await asyncio.to_thread(
+                    self.event_resolver, self.email, conflicting_event
+                )
+            if conflicting_event is not None:
+                if 'Off Hours' in conflicting_event.get('Summary', ''):
+                    conflict_type = "outside working hours"
+                else:
+                    conflict_type = f"conflicts with {conflicting_event['Summary']}"
             
             if urgency in ['urgent', 'high'] and 'outside working hours' in conflict_type:
                 decision = 'CONDITIONAL_ACCEPT'
@@ -141,8 +177,10 @@ class ParticipantAgent:
                 'detailed_reasoning': reasoning
             }
         
-        preference_score = self._calculate_preference_score(start_time)
-        hour = start_time.hour
+        # Preferences are in this participant's local time; a naive time is taken as local already
+        local_start = start_time.astimezone(self.timezone) if start_time.tzinfo is not None else start_time
+        preference_score = self._calculate_preference_score(local_start)
+        hour = local_start.hour
         
         if preference_score >= 0.7:
             if 9 <= hour < 12:
@@ -178,16 +216,19 @@ class ParticipantAgent:
             'detailed_reasoning': reasoning
         }
     
-    async def suggest_alternatives(self, target_date, duration_mins: int, urgency: str = "medium") -> List[Dict]:
-        available_slots = self.find_available_slots(target_date.strftime("%Y-%m-%d"), duration_mins)
+    def alternative_slots(self, target_date, duration_mins: int, urgency: str = "medium") -> List[Slot]:
+        available_slots = self.available_slots(target_date.strftime("%Y-%m-%d"), duration_mins)
         
-        if urgency in ['urgent', 'high'] and len(available_slots) < 3:
+        if self._needs_extended_hours(available_slots, urgency):
             extended_slots = self._find_extended_slots(target_date, duration_mins)
             available_slots.extend(extended_slots)
         
+        return available_slots[:3]
+    
+    async def suggest_alternatives(self, target_date, duration_mins: int, urgency: str = "medium") -> List[Dict]:
         alternatives = []
-        for slot in available_slots[:3]:
-            start_dt = datetime.fromisoformat(slot['start_time'])
+        for slot in self.alternative_slots(target_date, duration_mins, urgency):
+            start_dt = slot.start_datetime()
             
             if 9 <= start_dt.hour < 12:
                 reasoning = "Good morning time for focused discussion"
@@ -197,16 +238,16 @@ class ParticipantAgent:
                 reasoning = "Available time that could work"
             
             alternatives.append({
-                'start_time': slot['start_time'],
-                'end_time': slot['end_time'],
-                'preference_score': slot['preference_score'],
+                'start_time': slot.start_iso(),
+                'end_time': slot.end_iso(),
+                'preference_score': slot.preference_score,
                 'time_display': f"{start_dt.strftime('%H:%M')} IST",
                 'reasoning': reasoning
             })
         
         return alternatives
     
-    def _find_extended_slots(self, target_date, duration_mins: int) -> List[Dict]:
+    def _find_extended_slots(self, target_date, duration_mins: int) -> List[Slot]:
         extended_slots = []
         
         for hour in [7, 8, 18]:
@@ -216,12 +257,45 @@ class ParticipantAgent:
             end_time = start_time + timedelta(minutes=duration_mins)
             
             if not self._has_conflict(start_time, end_time):
-                extended_slots.append({
-                    'start_time': start_time.isoformat(),
-                    'end_time': end_time.isoformat(),
-                    'preference_score': 0.4,
-                    'participant': self.email,
-                    'is_extended_hours': True
-                })
-        
-        return extended_slots
\ No newline at end of file
+                extended_slots.append(Slot(
+                    int(start_time.timestamp()),
+                    int(end_time.timestamp()),
+                    self.timezone,
+                    participant=self.email,
+                    preference_score=0.4,
+                    is_extended_hours=True
+                ))
+        
+        return extended_slots
+
+class ParticipantAgentPool:
+    """Idle ParticipantAgents kept per email between requests.
+    
+    acquire() hands an agent to exactly one request at a time, reusing an idle
+    one (timezone and preference state intact, calendar swapped in) when
+    available; release() returns agents once the request is done.
+    """
+    
+    def __init__(self, max_idle_per_email: int = 4):
+        self.max_idle_per_email = max_idle_per_email
+        self._idle = {}
+        self._lock = threading.Lock()
+    
+    def acquire(self, email: str, calendar_data: List[Dict], preferences: Dict, llm_client=None,
+                event_resolver=None, busy_index: BusyIntervalIndex = None) -> ParticipantAgent:
+        with self._lock:
+            idle_agents = self._idle.get(email)
+            agent = idle_agents.pop() if idle_agents else None
+        
+        if agent is None:
+            return ParticipantAgent(email, calendar_data, preferences, llm_client, event_resolver, busy_index)
+        
+        agent.reset(calendar_data, preferences, llm_client, event_resolver, busy_index)
+        return agent
+    
+    def release(self, agents: List[ParticipantAgent]):
+        with self._lock:
+            for agent in agents:
+                idle_agents = self._idle.setdefault(agent.email, [])
+                if len(idle_agents) < self.max_idle_per_email:
+                    idle_agents.append(agent)
@@ -0,0 +1,131 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from email_features import WEEKDAYS
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class ScoringRules(NamedTuple):
+    """How a preference profile turns into a score for one local hour."""
+    windows: Tuple[Tuple[str, int, int, float], ...]
+    lunch_penalty: float
+    seniority_base: float
+    seniority_scale: float
+
+
+# ParticipantAgent._calculate_preference_score
+PARTICIPANT_RULES = ScoringRules(
+    windows=(('morning', 9, 12, 0.3), ('afternoon', 13, 17, 0.3)),
+    lunch_penalty=0.3,
+    seniority_base=0.8,
+    seniority_scale=0.4
+)
+
+# The calculate_preference_score tool
+TOOL_RULES = ScoringRules(
+    windows=(('morning', 9, 12, 0.3), ('afternoon', 13, 17, 0.3), ('evening', 17, 20, 0.2)),
+    lunch_penalty=0.4,
+    seniority_base=0.7,
+    seniority_scale=0.6
+)
+
+
+class PreferenceTable:
+    """Preference scores indexed by weekday and local minute of day.
+
+    days holds seven 1440-entry lists, Monday first; weekdays without their own
+    pattern share one list.
+    """
+
+    __slots__ = ('days',)
+
+    def __init__(self, days: Tuple[List[float], ...]):
+        self.days = days
+
+    def day(self, weekday: int) -> List[float]:
+        return self.days[weekday]
+
+    def score(self, local_time: datetime) -> float:
+        return self.days[local_time.weekday()][local_time.hour * 60 + local_time.minute]
+
+    def scores(self, local_times: Iterable[datetime]) -> List[float]:
+        days = self.days
+        return [days[local_time.weekday()][local_time.hour * 60 + local_time.minute] for local_time in local_times]
+
+
+def _profile_fields(preferences: Dict) -> tuple:
+    preferred_times = preferences.get('preferred_times', [])
+    if isinstance(preferred_times, str):
+        preferred_times = [preferred_times]
+    return (
+        tuple(preferred_times),
+        bool(preferences.get('avoid_lunch', False)),
+        preferences.get('seniority_weight', 0.5)
+    )
+
+
+def _weekday_index(day) -> int:
+    if isinstance(day, int) and 0 <= day < 7:
+        return day
+    name = str(day).strip().lower()
+    if name in WEEKDAYS:
+        return WEEKDAYS.index(name)
+    if name.isdigit() and int(name) < 7:
+        return int(name)
+    raise ValueError(f"Unknown weekday in weekly_pattern: {day!r}")
+
+
+def _profile_key(preferences: Dict) -> tuple:
+    """The parts of preferences that affect scores, as a hashable key.
+
+    weekly_pattern maps a weekday (name or 0-6, Monday is 0) to preference
+    overrides that apply on that day only, e.g.
+    {'friday': {'preferred_times': ['morning'], 'avoid_lunch': False}}.
+    Entries for unknown weekdays are ignored.
+    """
+    weekly = []
+    for day, overrides in (preferences.get('weekly_pattern') or {}).items():
+        try:
+            weekly.append((_weekday_index(day), _profile_fields({**preferences, **(overrides or {})})))
+        except ValueError:
+            continue
+    return _profile_fields(preferences), tuple(sorted(weekly))
+
+
+def _hour_score(hour: int, fields: tuple, rules: ScoringRules) -> float:
+    preferred_times, avoid_lunch, seniority = fields
+    score = 0.5
+
+    for name, start_hour, end_hour, bonus in rules.windows:
+        if name in preferred_times and start_hour <= hour < end_hour:
+            score += bonus
+            break
+
+    if avoid_lunch and 12 <= hour < 14:
+        score -= rules.lunch_penalty
+
+    score = score * (rules.seniority_base + rules.seniority_scale * seniority)
+
+    return max(0.0, min(1.0, score))
+
+
+def _day_scores(fields: tuple, rules: ScoringRules) -> List[float]:
+    hour_scores = [_hour_score(hour, fields, rules) for hour in range(24)]
+    return [hour_scores[minute // 60] for minute in range(MINUTES_PER_DAY)]
+
+
+@lru_cache(maxsize=256)
+def _compile(key: tuple, rules: ScoringRules) -> PreferenceTable:
+    base_fields, weekly = key
+    base_day = _day_scores(base_fields, rules)
+    days = [base_day] * 7
+    for weekday, fields in weekly:
+        days[weekday] = base_day if fields == base_fields else _day_scores(fields, rules)
+    return PreferenceTable(tuple(days))
+
+
+def compile_preferences(preferences: Dict, rules: ScoringRules = PARTICIPANT_RULES) -> PreferenceTable:
+    """The PreferenceTable for preferences, compiled once per distinct profile."""
+    return _compile(_profile_key(preferences or {}), rules)
@@ -0,0 +1,204 @@
+"""
+Opt-in per-request profiling for schedule_meeting
+
+A request is profiled when it carries the X-Profile header or is picked by
+PROFILE_SAMPLE_RATE. Each profile lands in PROFILE_DIR named after its
+Request_id: a cProfile .pstats file, or with PROFILE_FORMAT=collapsed a
+sampled .collapsed stack file that flamegraph.pl and speedscope read directly.
+
+Aggregate what real traffic produced:
+
+    python profiling.py profiles/ --top 30
+    python profiling.py profiles/ --sort cumulative --request-id 6118b54f
+    python profiling.py profiles/ --output merged.collapsed
+"""
+
+import argparse
+import cProfile
+import glob
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import List
+
+from config import PROFILING_CONFIG
+
+PROFILE_HEADER = 'X-Profile'
+
+
+def header_requests_profile(value: str) -> bool:
+    return value is not None and value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class _StackSampler(threading.Thread):
+    """Samples one thread's Python stack every interval seconds."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name='request-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[_collapse(frame)] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class RequestProfiler:
+    """Wraps chosen requests in cProfile or a stack sampler.
+
+    Both watch the event loop thread, so awaits interleaved from other requests
+    show up in the profile too; cProfile allows one active profile per process,
+    so a request that arrives while another is being profiled runs unprofiled.
+    """
+
+    def __init__(self, output_dir: str = None, sample_rate: float = None, profile_format: str = None,
+                 sample_interval_ms: float = None):
+        self.output_dir = output_dir or PROFILING_CONFIG['output_dir']
+        self.sample_rate = sample_rate if sample_rate is not None else PROFILING_CONFIG['sample_rate']
+        self.profile_format = profile_format or PROFILING_CONFIG['format']
+        self.sample_interval = (sample_interval_ms or PROFILING_CONFIG['sample_interval_ms']) / 1000
+        self._active = threading.Lock()
+
+    def should_profile(self, requested: bool = False) -> bool:
+        return requested or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def _output_path(self, request_id: str, extension: str) -> str:
+        safe_id = re.sub(r'[^A-Za-z0-9_.-]', '_', str(request_id))[:80] or 'unknown'
+        os.makedirs(self.output_dir, exist_ok=True)
+        return os.path.join(self.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_id}.{extension}")
+
+    @asynccontextmanager
+    async def profile(self, request_id: str):
+        if not self._active.acquire(blocking=False):
+            print(f"Profiler busy, running {request_id} unprofiled")
+            yield None
+            return
+
+        try:
+            if self.profile_format == 'collapsed':
+                sampler = _StackSampler(threading.get_ident(), self.sample_interval)
+                sampler.start()
+                try:
+                    yield sampler
+                finally:
+                    sampler.stop()
+                    path = self._output_path(request_id, 'collapsed')
+                    with open(path, 'w') as f:
+                        for stack, count in sampler.stacks.most_common():
+                            f.write(f"{stack} {count}\n")
+            else:
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    yield profiler
+                finally:
+                    profiler.disable()
+                    path = self._output_path(request_id, 'pstats')
+                    profiler.dump_stats(path)
+            print(f"Profile for {request_id} written to {path}")
+        finally:
+            self._active.release()
+
+
+request_profiler = RequestProfiler()
+
+
+def load_collapsed(paths: List[str]) -> Counter:
+    stacks = Counter()
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                if stack and count.isdigit():
+                    stacks[stack] += int(count)
+    return stacks
+
+
+def summarize_collapsed(stacks: Counter, top: int):
+    total = sum(stacks.values())
+    self_samples = Counter()
+    inclusive_samples = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(';')
+        self_samples[frames[-1]] += count
+        for frame in set(frames):
+            inclusive_samples[frame] += count
+
+    print(f"{total} samples")
+    for title, samples in (('self', self_samples), ('inclusive', inclusive_samples)):
+        print(f"\nTop {top} frames by {title} samples:")
+        for frame, count in samples.most_common(top):
+            print(f"  {count:8d} {count / total:7.1%}  {frame}")
+
+
+def _matching(paths: List[str], request_id: str = None) -> List[str]:
+    if not request_id:
+        return paths
+    return [path for path in paths if request_id in os.path.basename(path)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Aggregate per-request profiles')
+    parser.add_argument('directory', nargs='?', default=PROFILING_CONFIG['output_dir'])
+    parser.add_argument('--top', type=int, default=25)
+    parser.add_argument('--sort', default='tottime', help='pstats sort key, e.g. tottime or cumulative')
+    parser.add_argument('--request-id', help='only profiles whose Request_id contains this')
+    parser.add_argument('--output', help='write merged collapsed stacks or pstats here')
+    args = parser.parse_args()
+
+    pstats_files = _matching(sorted(glob.glob(os.path.join(args.directory, '*.pstats'))), args.request_id)
+    collapsed_files = _matching(sorted(glob.glob(os.path.join(args.directory, '*.collapsed'))), args.request_id)
+
+    if not pstats_files and not collapsed_files:
+        print(f"No profiles found in {args.directory}")
+        return
+
+    if pstats_files:
+        print(f"Aggregating {len(pstats_files)} pstats profiles")
+        stats = pstats.Stats(*pstats_files)
+        stats.strip_dirs().sort_stats(args.sort).print_stats(args.top)
+        if args.output and not collapsed_files:
+            stats.dump_stats(args.output)
+
+    if collapsed_files:
+        print(f"Aggregating {len(collapsed_files)} collapsed stack profiles")
+        stacks = load_collapsed(collapsed_files)
+        summarize_collapsed(stacks, args.top)
+        if args.output:
+            with open(args.output, 'w') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+
+    if args.output:
+        print(f"Merged profile written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
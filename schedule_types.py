@@ -0,0 +1,97 @@
+from datetime import datetime
+from typing import Dict, Tuple
+
+
+def to_epoch(iso_time: str) -> int:
+    return int(datetime.fromisoformat(iso_time.replace('Z', '+00:00')).timestamp())
+
+
+def is_off_hours(event: Dict) -> bool:
+    return 'Off Hours' in event.get('Summary', '')
+
+
+class Event:
+    """A calendar event as UTC epoch seconds; source is the original event dict."""
+
+    __slots__ = ('start', 'end', 'summary', 'off_hours', 'source')
+
+    def __init__(self, start: int, end: int, summary: str, off_hours: bool, source: Dict):
+        self.start = start
+        self.end = end
+        self.summary = summary
+        self.off_hours = off_hours
+        self.source = source
+
+    @classmethod
+    def from_dict(cls, event: Dict) -> 'Event':
+        return cls(
+            to_epoch(event['StartTime']),
+            to_epoch(event['EndTime']),
+            event.get('Summary', ''),
+            is_off_hours(event),
+            event
+        )
+
+    def __repr__(self) -> str:
+        return f"Event({self.start}, {self.end}, {self.summary!r})"
+
+
+class Slot:
+    """A candidate meeting slot as UTC epoch seconds plus the timezone it is shown in.
+
+    Scores are filled in as the slot moves through the negotiator; ISO strings
+    and display text are only produced for slots that reach a response.
+    """
+
+    __slots__ = ('start', 'end', 'tz', 'participant', 'preference_score', 'is_extended_hours',
+                 'average_preference', 'consensus_score', 'urgency_bonus', 'overall_score', 'day_offset')
+
+    def __init__(self, start: int, end: int, tz, participant: str = None, preference_score: float = 0.5,
+                 is_extended_hours: bool = False):
+        self.start = start
+        self.end = end
+        self.tz = tz
+        self.participant = participant
+        self.preference_score = preference_score
+        self.is_extended_hours = is_extended_hours
+        self.average_preference = 0.0
+        self.consensus_score = 0.0
+        self.urgency_bonus = 0.0
+        self.overall_score = 0.0
+        self.day_offset = 0
+
+    @classmethod
+    def from_iso(cls, start_time: str, end_time: str) -> 'Slot':
+        start_dt = datetime.fromisoformat(start_time)
+        end_dt = datetime.fromisoformat(end_time)
+        return cls(int(start_dt.timestamp()), int(end_dt.timestamp()), start_dt.tzinfo)
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        return self.start, self.end
+
+    def start_datetime(self) -> datetime:
+        return datetime.fromtimestamp(self.start, self.tz)
+
+    def end_datetime(self) -> datetime:
+        return datetime.fromtimestamp(self.end, self.tz)
+
+    def start_iso(self) -> str:
+        return self.start_datetime().isoformat()
+
+    def end_iso(self) -> str:
+        return self.end_datetime().isoformat()
+
+    def to_dict(self) -> Dict:
+        slot = {
+            'start_time': self.start_iso(),
+            'end_time': self.end_iso(),
+            'preference_score': self.preference_score,
+            'participant': self.participant
+        }
+        if self.is_extended_hours:
+            slot['is_extended_hours'] = True
+        return slot
+
+    def __repr__(self) -> str:
+        return f"Slot({self.start_iso()}, {self.end_iso()})"
@@ -0,0 +1,208 @@
+"""
+Local stand-in for the Google Calendar client that replays recorded responses.
+
+Recordings map each user to the raw event items events().list returned for
+them, e.g. {"userone.amd@gmail.com": [{"start": {...}, "end": {...}, ...}]}.
+freebusy().query and batch requests are answered from the same recordings, so
+every CalendarFetcher mode can run offline:
+
+    recordings = load_recordings("tests/recorded_calendars.json")
+    fetcher = CalendarFetcher(fetch_mode="freebusy", service_factory=replay_factory(recordings))
+
+Incremental sync is replayed too: factory.record_change(user, item) edits a
+calendar (status "cancelled" deletes), syncToken requests return only the
+changes since their token, and factory.expire_sync_tokens() makes the next
+one fail with 410 Gone. With page_size set, events().list answers in pages
+of that many items linked by nextPageToken. All-day items (start.date only)
+count as whole UTC days.
+"""
+
+import json
+from datetime import datetime
+
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _bounds(item: dict):
+    if 'dateTime' in item['start']:
+        return _parse(item['start']['dateTime']), _parse(item['end']['dateTime'])
+    return _parse(item['start']['date'] + 'T00:00:00+00:00'), _parse(item['end']['date'] + 'T00:00:00+00:00')
+
+
+def load_recordings(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+class ReplayHttpError(Exception):
+    """Shaped like googleapiclient.errors.HttpError: carries resp.status."""
+
+    def __init__(self, status: int, message: str = ""):
+        super().__init__(message or f"HTTP {status}")
+        self.resp = type("Response", (), {"status": status})()
+
+
+def recordings_from_mock_events(events_by_user: dict) -> dict:
+    """Turn scheduler-format events (StartTime/EndTime/...) back into Google items."""
+    recordings = {}
+    for user, events in events_by_user.items():
+        recordings[user] = [
+            {
+                "id": f"{user.split('@')[0]}-{index}",
+                "summary": event["Summary"],
+                "start": {"dateTime": event["StartTime"]},
+                "end": {"dateTime": event["EndTime"]},
+                "attendees": [
+                    {"email": attendee} for attendee in event.get("Attendees", []) if attendee != "SELF"
+                ] or None
+            }
+            for index, event in enumerate(events)
+        ]
+        for item in recordings[user]:
+            if item["attendees"] is None:
+                del item["attendees"]
+    return recordings
+
+
+class ReplayRequest:
+    def __init__(self, handler):
+        self._handler = handler
+
+    def execute(self, http=None):
+        return self._handler()
+
+
+class ReplayEvents:
+    def __init__(self, service):
+        self._service = service
+
+    def list(self, calendarId='primary', timeMin=None, timeMax=None, singleEvents=True, orderBy=None,
+             syncToken=None, pageToken=None):
+        if syncToken is not None:
+            return ReplayRequest(lambda: self._service.changes_since(syncToken))
+
+        def handler():
+            self._service.calls.append(('events.list', self._service.user))
+            items = [
+                item for item in self._service.items()
+                if _bounds(item)[1] > _parse(timeMin) and _bounds(item)[0] < _parse(timeMax)
+            ]
+            items.sort(key=lambda item: _bounds(item)[0])
+
+            page_size = self._service.page_size
+            if page_size:
+                offset = int(pageToken or 0)
+                if offset + page_size < len(items):
+                    return {'items': items[offset:offset + page_size], 'nextPageToken': str(offset + page_size)}
+                items = items[offset:]
+            return {'items': items, 'nextSyncToken': self._service.sync_token()}
+        return ReplayRequest(handler)
+
+
+class ReplayFreeBusy:
+    def __init__(self, service):
+        self._service = service
+
+    def query(self, body):
+        def handler():
+            self._service.calls.append(('freebusy.query', self._service.user))
+            time_min, time_max = _parse(body['timeMin']), _parse(body['timeMax'])
+            calendars = {}
+            for item in body['items']:
+                user = item['id']
+                if user not in self._service.recordings:
+                    calendars[user] = {'errors': [{'domain': 'global', 'reason': 'notFound'}], 'busy': []}
+                    continue
+                busy = []
+                for event in self._service.recordings[user]:
+                    if event.get('transparency') == 'transparent':
+                        continue
+                    start, end = _bounds(event)
+                    if end > time_min and start < time_max:
+                        busy.append({'start': start.isoformat(), 'end': end.isoformat()})
+                busy.sort(key=lambda block: block['start'])
+                calendars[user] = {'busy': busy}
+            return {'calendars': calendars}
+        return ReplayRequest(handler)
+
+
+class ReplayBatch:
+    def __init__(self, service, callback=None):
+        self._service = service
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, callback=None, request_id=None):
+        self._requests.append((request, callback or self._callback, request_id))
+
+    def execute(self, http=None):
+        self._service.calls.append(('batch', len(self._requests)))
+        for request, callback, request_id in self._requests:
+            try:
+                response, exception = request.execute(), None
+            except Exception as e:
+                response, exception = None, e
+            callback(request_id, response, exception)
+
+
+class ReplayService:
+    def __init__(self, user: str, recordings: dict, calls: list, changes: dict, expired: set,
+                 page_size: int = None):
+        self.user = user
+        self.recordings = recordings
+        self.calls = calls
+        self.changes = changes
+        self.expired = expired
+        self.page_size = page_size
+
+    def sync_token(self) -> str:
+        return str(len(self.changes.get(self.user, [])))
+
+    def changes_since(self, sync_token: str) -> dict:
+        self.calls.append(('events.sync', self.user))
+        if self.user in self.expired:
+            self.expired.discard(self.user)
+            raise ReplayHttpError(410, "Sync token is no longer valid, a full sync is required.")
+        items = self.changes.get(self.user, [])[int(sync_token):]
+        return {'items': list(items), 'nextSyncToken': self.sync_token()}
+
+    def items(self):
+        if self.user not in self.recordings:
+            raise KeyError(f"no recording for {self.user}")
+        return self.recordings[self.user]
+
+    def events(self):
+        return ReplayEvents(self)
+
+    def freebusy(self):
+        return ReplayFreeBusy(self)
+
+    def new_batch_http_request(self, callback=None):
+        return ReplayBatch(self, callback)
+
+
+def replay_factory(recordings: dict, calls: list = None, page_size: int = None):
+    """service_factory for CalendarFetcher; every request made is appended to calls."""
+    calls = calls if calls is not None else []
+    changes = {}
+    expired = set()
+
+    def factory(user: str):
+        return ReplayService(user, recordings, calls, changes, expired, page_size)
+
+    def record_change(user: str, item: dict):
+        events = [event for event in recordings.get(user, []) if event['id'] != item['id']]
+        if item.get('status') != 'cancelled':
+            events.append(item)
+        recordings[user] = events
+        changes.setdefault(user, []).append(item)
+
+    def expire_sync_tokens():
+        expired.update(recordings)
+
+    factory.calls = calls
+    factory.record_change = record_change
+    factory.expire_sync_tokens = expire_sync_tokens
+    return factory
@@ -0,0 +1,121 @@
+from calendar_fetcher import CalendarFetcher
+from calendar_store import CalendarStore
+from tests.google_replay import replay_factory
+
+USERS = ["userone.amd@gmail.com", "usertwo.amd@gmail.com"]
+DAY_START = "2025-07-17T00:00:00+05:30"
+DAY_END = "2025-07-17T23:59:59+05:30"
+
+
+def _item(event_id: str, start: str, end: str, summary: str = "Meeting") -> dict:
+    return {
+        "id": event_id,
+        "summary": summary,
+        "start": {"dateTime": f"2025-07-17T{start}:00+05:30"},
+        "end": {"dateTime": f"2025-07-17T{end}:00+05:30"}
+    }
+
+
+def _recordings() -> dict:
+    return {
+        USERS[0]: [_item("one-1", "10:00", "10:30", "Standup"), _item("one-2", "14:00", "15:00", "Review")],
+        USERS[1]: [_item("two-1", "11:00", "12:00", "Planning")]
+    }
+
+
+def _fetcher(mode: str, recordings: dict = None, **replay_options) -> CalendarFetcher:
+    factory = replay_factory(recordings if recordings is not None else _recordings(), **replay_options)
+    return CalendarFetcher(fetch_mode=mode, max_workers=2, service_factory=factory)
+
+
+def _starts(events: list) -> list:
+    return [event["StartTime"] for event in events]
+
+
+def test_events_mode_lists_each_user():
+    fetcher = _fetcher("events")
+    results = fetcher.fetch_many(USERS, DAY_START, DAY_END)
+
+    assert [event["Summary"] for event in results[USERS[0]]] == ["Standup", "Review"]
+    assert [event["Summary"] for event in results[USERS[1]]] == ["Planning"]
+    assert sorted(fetcher.service_factory.calls) == [("events.list", user) for user in USERS]
+
+
+def test_batch_mode_sends_one_batch_request():
+    fetcher = _fetcher("batch")
+    results = fetcher.fetch_many(USERS, DAY_START, DAY_END)
+
+    assert results == _fetcher("events").fetch_many(USERS, DAY_START, DAY_END)
+    assert fetcher.service_factory.calls[0] == ("batch", 2)
+    assert [call for call in fetcher.service_factory.calls if call[0] == "batch"] == [("batch", 2)]
+
+
+def test_freebusy_mode_returns_busy_blocks():
+    fetcher = _fetcher("freebusy")
+    results = fetcher.fetch_many(USERS, DAY_START, DAY_END)
+
+    assert _starts(results[USERS[0]]) == ["2025-07-17T10:00:00+05:30", "2025-07-17T14:00:00+05:30"]
+    assert {event["Summary"] for event in results[USERS[0]] + results[USERS[1]]} == {"Busy"}
+    assert fetcher.service_factory.calls == [("freebusy.query", USERS[0])]
+
+
+def test_freebusy_mode_falls_back_for_unknown_calendars():
+    recordings = _recordings()
+    del recordings[USERS[1]]
+    fetcher = _fetcher("freebusy", recordings)
+    results = fetcher.fetch_many(USERS, DAY_START, DAY_END)
+
+    assert len(results[USERS[0]]) == 2
+    assert results[USERS[1]] == []
+
+
+def test_store_syncs_incrementally_then_resyncs_on_expired_token():
+    fetcher = _fetcher("events")
+    factory = fetcher.service_factory
+    store = CalendarStore(fetcher, ttl_seconds=0, window_days=1)
+
+    assert len(store.get_many(USERS, DAY_START, DAY_END)[USERS[0]]) == 2
+
+    factory.record_change(USERS[0], _item("one-3", "16:00", "16:30", "Sync"))
+    assert len(store.get_many(USERS, DAY_START, DAY_END)[USERS[0]]) == 3
+    assert store.stats()["incremental_syncs"] == 2
+
+    factory.record_change(USERS[0], {"id": "one-1", "status": "cancelled"})
+    factory.expire_sync_tokens()
+    events = store.get_many(USERS, DAY_START, DAY_END)[USERS[0]]
+
+    assert _starts(events) == ["2025-07-17T14:00:00+05:30", "2025-07-17T16:00:00+05:30"]
+    assert store.stats()["full_syncs"] == 4
+    assert factory.calls.count(("events.sync", USERS[0])) == 2
+
+
+def test_sync_many_follows_pages():
+    recordings = _recordings()
+    recordings[USERS[0]] += [_item(f"one-{n}", f"{n}:00", f"{n}:30") for n in range(16, 20)]
+
+    for mode in ("events", "batch"):
+        fetcher = _fetcher(mode, recordings, page_size=2)
+        synced = fetcher.sync_many(USERS, DAY_START, DAY_END)
+
+        items, sync_token = synced[USERS[0]]
+        assert [item["id"] for item in items] == ["one-1", "one-2"] + [f"one-{n}" for n in range(16, 20)]
+        assert sync_token is not None
+        assert fetcher.service_factory.calls.count(("events.list", USERS[0])) >= 3
+        assert [item["id"] for item in synced[USERS[1]][0]] == ["two-1"]
+
+
+def test_all_day_events_do_not_block_time():
+    recordings = _recordings()
+    recordings[USERS[0]].append({
+        "id": "one-holiday",
+        "summary": "Company holiday",
+        "start": {"date": "2025-07-17"},
+        "end": {"date": "2025-07-18"}
+    })
+
+    fetched = _fetcher("events", recordings).fetch_many(USERS, DAY_START, DAY_END)
+    stored = CalendarStore(_fetcher("batch", recordings), window_days=1).get_many(USERS, DAY_START, DAY_END)
+
+    for results in (fetched, stored):
+        assert [event["Summary"] for event in results[USERS[0]]] == ["Standup", "Review"]
+        assert len(results[USERS[1]]) == 1
@@ -0,0 +1,66 @@
+import pytest
+
+from email_parser import EmailParser
+
+NEXT_THURSDAY = "Hi Team. Let's meet next Thursday for 30 minutes and discuss about our Goals."
+
+
+class StubLLM:
+    def __init__(self, suggested_date: str = "2025-07-17"):
+        self.prompts = []
+        self.suggested_date = suggested_date
+
+    def generate(self, prompt: str, max_tokens: int = 150) -> str:
+        self.prompts.append(prompt)
+        return ('{"suggested_date": "%s", "suggested_time": null, "duration_minutes": 30, '
+                '"urgency": "low", "meeting_type": "discussion"}' % self.suggested_date)
+
+
+@pytest.mark.parametrize("request_datetime, expected", [
+    ("15-07-2025T12:34:55", "2025-07-17"),
+    ("02-07-2025T12:34:55", "2025-07-03"),
+    ("09-07-2025T12:34:55", "2025-07-10"),
+    ("10-07-2025T12:34:55", "2025-07-17"),
+    ("05-07-2025T12:34:55", "2025-07-10"),
+])
+def test_next_weekday_on_fast_path_is_the_first_one_after_the_request(request_datetime, expected):
+    llm = StubLLM(suggested_date="1999-01-01")
+    parser = EmailParser(llm_service=llm)
+
+    result = parser.parse_email(NEXT_THURSDAY, request_datetime)
+
+    assert result["suggested_date"] == expected
+    assert parser.path_counts["regex_fast_path"] == 1
+    assert llm.prompts == []
+
+
+def test_iso_request_datetime_anchors_relative_dates():
+    parser = EmailParser(llm_service=StubLLM(suggested_date="1999-01-01"))
+
+    assert parser.parse_email(NEXT_THURSDAY, "2025-07-15T12:34:55")["suggested_date"] == "2025-07-17"
+    assert parser.parse_email("Meet tomorrow for 1 hour", "2025-07-15T12:34:55")["suggested_date"] == "2025-07-16"
+
+
+def test_unreadable_request_datetime_goes_to_the_llm():
+    llm = StubLLM()
+    parser = EmailParser(llm_service=llm)
+
+    result = parser.parse_email(NEXT_THURSDAY, "15/07/2025 12:34")
+
+    assert result["suggested_date"] == "2025-07-17"
+    assert parser.path_counts == {"regex_fast_path": 0, "llm": 1, "regex_fallback": 0}
+    assert len(llm.prompts) == 1
+
+
+@pytest.mark.parametrize("email_content", [
+    NEXT_THURSDAY,
+    "Let's catch up Monday 2 PM",
+    "Can we sync for 30 minutes next week?",
+    "Quick chat please",
+])
+def test_target_date_matches_the_regex_parse(email_content):
+    parser = EmailParser()
+
+    for request_datetime in ("14-07-2025T12:34:55", "18-07-2025T09:00:00"):
+        parsed = parser.parse_email(email_content, request_datetime)
+        assert parser.target_date(email_content, request_datetime) == parsed["suggested_date"]
@@ -1,10 +1,11 @@
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import pytz
-import re
 from pydantic import Field
 from pydantic_ai import Tool
 from config import get_timezone_for_email, get_user_preferences
+from email_features import extract_email_features
+from preference_table import TOOL_RULES, compile_preferences
 from models import CalendarEvent, TimeSlot, UserPreferences
 
 @Tool
@@ -78,26 +79,9 @@ def extract_duration_from_text(text: str) -> int:
     Returns:
         Duration in minutes
     """
-    text_lower = text.lower()
-    
-    patterns = [
-        r'(\d+)\s*minutes?',
-        r'(\d+)\s*mins?', 
-        r'(\d+)\s*hours?',
-        r'(\d+)\s*hrs?',
-        r'for\s+(\d+)\s*minutes?',
-        r'for\s+(\d+)\s*hours?',
-        r'(\d+)-minute',
-        r'(\d+)-hour'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text_lower)
-        if match:
-            duration = int(match.group(1))
-            if 'hour' in pattern or 'hr' in pattern:
-                duration *= 60
-            return duration
+    duration_minutes = extract_email_features(text).duration_minutes
+    if duration_minutes is not None:
+        return duration_minutes
     
     return 30  # Default duration
 
@@ -219,28 +203,10 @@ def calculate_preference_score(start_time: str, user_preferences: Dict[str, Any]
     """
     try:
         dt = datetime.fromisoformat(start_time)
-        hour = dt.hour
-        
-        score = 0.5  # Base score
-        
-        # Preferred times
-        preferred_times = user_preferences.get('preferred_times', [])
-        if 'morning' in preferred_times and 9 <= hour < 12:
-            score += 0.3
-        elif 'afternoon' in preferred_times and 13 <= hour < 17:
-            score += 0.3
-        elif 'evening' in preferred_times and 17 <= hour < 20:
-            score += 0.2
-        
-        # Avoid lunch time
-        if user_preferences.get('avoid_lunch', False) and 12 <= hour < 14:
-            score -= 0.4
-        
-        # Seniority weight
-        seniority = user_preferences.get('seniority_weight', 0.5)
-        score = score * (0.7 + 0.6 * seniority)
         
-        return max(0.0, min(1.0, score))
+        # Scores come from the profile's compiled table, built once per distinct
+        # preferences (windows, lunch penalty and seniority as in TOOL_RULES)
+        return compile_preferences(user_preferences, TOOL_RULES).score(dt)
     except:
         return 0.5
 